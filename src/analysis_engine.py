@@ -1,13 +1,87 @@
-import csv
+import os
+from array import array
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict
 import statistics
 import logging
+from fast_ingest import read_sales_csv
+from hyperloglog import HyperLogLog, hash_value
+from partitioned_dataset import PartitionedDataset, normalize_date
+from resampling import (BootstrapEngine, confidence_label, mean_growth, mean_of_totals,
+                        ratio_of_sums, segment_ratios)
+from sales_columns import SalesColumns, group_sums, group_sums_many
+from shared_dataset import SHARED_PREFIX, SharedSalesDataset, parallel_group_totals
+
+SKETCH_DIMENSIONS = {
+    'day': 'sale_date',
+    'region': 'region',
+    'product': 'product',
+}
 
 class SalesAnalyzer:
-    def __init__(self, data_path='data/sample_sales.csv'):
+    def __init__(self, data_path='data/sample_sales.csv', sketch_precision=12, quarantine_path=None,
+                 bootstrap=None, confidence_threshold=0.7):
         self.logger = self.setup_logger()
-        self.data = self.load_data(data_path)
+        self.data_path = data_path
+        self.dataset = None
+        self.shared = None
+        self._columns = None
+        self.sketch_precision = sketch_precision
+        self.quarantined = 0
+        self._quarantined_partitions = set()
+        
+        # Intervalos bootstrap (cacheados hasta que cambian los datos)
+        # El pool de un motor propio (no recibido) se cierra en close()
+        self._owns_bootstrap = bootstrap is None
+        self.bootstrap = bootstrap or BootstrapEngine()
+        self.confidence_threshold = confidence_threshold
+        self._interval_cache = {}
+        self._segment_totals = None
+        
+        # Filas inválidas: archivo de cuarentena junto a los datos
+        if quarantine_path is None and not data_path.startswith(SHARED_PREFIX):
+            if data_path.endswith('.csv'):
+                quarantine_path = data_path[:-len('.csv')] + '_quarantine.csv'
+            else:
+                quarantine_path = os.path.join(data_path, 'quarantine.csv')
+        self.quarantine_path = quarantine_path
+        
+        # Posición de lectura para cargar solo filas añadidas (modo CSV)
+        self._read_offset = 0
+        self._line_number = 0
+        self._fieldnames = None
+        self._head = b''
+        
+        if data_path.startswith(SHARED_PREFIX):
+            # Dataset en memoria compartida: columnas y agregados sin copiar ni parsear
+            self.shared = self.attach_shared(data_path[len(SHARED_PREFIX):])
+            self._columns = self.shared.columns
+            self.daily_sales, self.daily_orders = self.shared.daily_aggregates()
+        elif data_path.endswith('.csv'):
+            self._columns = self.load_data(data_path)
+            self.daily_sales, self.daily_orders = self.aggregate_daily(self._columns)
+        else:
+            # Directorio particionado: solo se lee el manifiesto. La cuarentena
+            # se rehace a medida que se leen particiones en esta sesión
+            if os.path.exists(quarantine_path):
+                os.remove(quarantine_path)
+            self.dataset = self.open_dataset(data_path)
+            self.daily_sales, self.daily_orders = self.dataset.daily_aggregates()
+        
+        # Sketch de clientes distintos (opcional, sketch_precision=None lo desactiva)
+        self.customer_sketch = self.build_customer_sketch() if sketch_precision else None
+    
+    @property
+    def columns(self):
+        """Columnas tipadas en memoria (en modo particionado se leen al primer uso)"""
+        if self._columns is None:
+            self._columns = self.columns_between()
+        return self._columns
+    
+    @property
+    def data(self):
+        """Registros como dicts (compatibilidad; materializa todas las filas)"""
+        return list(self.columns.records())
     
     def setup_logger(self):
         """Sistema de logging profesional - debe ir PRIMERO"""
@@ -23,19 +97,16 @@ class SalesAnalyzer:
     
     def load_data(self, data_path):
         """Cargar datos desde CSV"""
-        data = []
         try:
-            with open(data_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                for row in reader:
-                    # Convertir tipos de datos
-                    row['quantity'] = int(row['quantity'])
-                    row['unit_price'] = float(row['unit_price'])
-                    row['total_sale'] = float(row['total_sale'])
-                    data.append(row)
+            result = read_sales_csv(data_path, quarantine_path=self.quarantine_path)
+            self._read_offset = result.offset
+            self._line_number = result.line_number
+            self._fieldnames = result.fieldnames
+            self._head = self.read_head(data_path, self._read_offset)
+            self.quarantined = result.quarantined
             
-            self.logger.info(f"Datos cargados: {len(data)} registros desde {data_path}")
-            return data
+            self.logger.info(f"Datos cargados: {len(result.columns)} registros desde {data_path}")
+            return result.columns
             
         except FileNotFoundError:
             self.logger.error(f"Archivo no encontrado: {data_path}")
@@ -44,39 +115,405 @@ class SalesAnalyzer:
             self.logger.error(f"Error cargando datos: {e}")
             raise
     
+    def attach_shared(self, name):
+        """Adjuntarse a un dataset publicado por otro proceso"""
+        try:
+            shared = SharedSalesDataset.attach(name)
+        except FileNotFoundError:
+            self.logger.error(f"Dataset compartido no encontrado: {name}")
+            raise
+        self.logger.info(f"Adjuntado a dataset compartido '{name}': {shared.rows} registros")
+        return shared
+    
+    def publish_shared(self, name=None):
+        """Publicar las columnas en memoria compartida y devolver su nombre
+        
+        Otros procesos se adjuntan con ``SalesAnalyzer('shm://<nombre>')``.
+        Este analizador pasa a usar la copia compartida (una sola copia en
+        memoria) y queda como instantánea: ya no incorpora filas nuevas.
+        """
+        if self.shared is None:
+            metadata = {
+                'source': self.data_path,
+                'daily_sales': self.daily_sales,
+                'daily_orders': self.daily_orders,
+                'quarantined': self.quarantined
+            }
+            if self.customer_sketch is not None:
+                metadata['hll_precision'] = self.sketch_precision
+                metadata['customers_hll'] = self.customer_sketch.to_base64()
+            
+            self.shared = SharedSalesDataset.publish(self.columns, metadata, name)
+            self._columns = self.shared.columns
+            self.logger.info(f"Dataset publicado en memoria compartida como '{self.shared.name}'")
+        return self.shared.name
+    
+    def close(self):
+        """Soltar la referencia al dataset compartido (si lo hay) y cerrar el
+        pool bootstrap si lo creó este analizador"""
+        if self.shared is not None:
+            self.shared.release()
+            self.shared = None
+        if self._owns_bootstrap:
+            self.bootstrap.shutdown()
+    
+    def read_partition(self, entry):
+        """Leer una partición a columnas tipadas
+        
+        Las filas inválidas de cada partición se envían a cuarentena solo la
+        primera vez que se lee (las consultas por fecha la releen).
+        """
+        first_read = entry['file'] not in self._quarantined_partitions
+        result = read_sales_csv(self.dataset.partition_path(entry),
+                                quarantine_path=self.quarantine_path if first_read else None,
+                                quarantine_append=True)
+        if first_read:
+            self._quarantined_partitions.add(entry['file'])
+            self.quarantined += result.quarantined
+        return result.columns
+    
+    @staticmethod
+    def read_head(data_path, limit, size=1024):
+        """Primeros bytes del archivo, para detectar si se reescribió"""
+        with open(data_path, 'rb') as f:
+            return f.read(min(size, limit))
+    
+    def load_new_rows(self):
+        """Incorporar solo las filas nuevas desde la última carga
+        
+        Devuelve cuántas filas nuevas hay. Si el CSV se reescribió (no solo
+        creció) se recarga completo.
+        """
+        if self.shared is not None:
+            # Instantánea compartida: los segmentos no cambian
+            return 0
+        if self.dataset is not None:
+            return self.load_new_partitions()
+        
+        size = os.path.getsize(self.data_path)
+        if size < self._read_offset or self.read_head(self.data_path, self._read_offset) != self._head:
+            self.logger.info(f"{self.data_path} fue reescrito, recarga completa")
+            self._interval_cache.clear()
+            self._segment_totals = None
+            self._columns = self.load_data(self.data_path)
+            self.daily_sales, self.daily_orders = self.aggregate_daily(self._columns)
+            if self.sketch_precision:
+                self.customer_sketch = self.build_customer_sketch()
+            return len(self._columns)
+        if size == self._read_offset:
+            return 0
+        
+        result = read_sales_csv(self.data_path, offset=self._read_offset, fieldnames=self._fieldnames,
+                                quarantine_path=self.quarantine_path,
+                                first_line=self._line_number + 1, complete_lines_only=True)
+        self._read_offset = result.offset
+        self._line_number = result.line_number
+        self.quarantined += result.quarantined
+        
+        self._columns.extend(result.columns)
+        self.add_to_aggregates(result.columns)
+        return len(result.columns)
+    
+    def load_new_partitions(self):
+        """Releer el manifiesto e incorporar solo las particiones nuevas
+        
+        Si el dataset se reemplazó (no solo creció) se recarga completo.
+        """
+        previous = self.dataset
+        self.dataset = PartitionedDataset(self.data_path)
+        if self.dataset_replaced(previous, self.dataset):
+            self.logger.info(f"{self.data_path} fue reemplazado, recarga completa")
+            return self.reload_dataset()
+        
+        known = {entry['file'] for entry in previous.partitions}
+        new_entries = [entry for entry in self.dataset.partitions if entry['file'] not in known]
+        if new_entries:
+            self._interval_cache.clear()
+        
+        for entry in new_entries:
+            for day, sales in entry['daily_sales'].items():
+                self.daily_sales[day] = self.daily_sales.get(day, 0) + sales
+                self.daily_orders[day] = self.daily_orders.get(day, 0) + entry['daily_orders'][day]
+            
+            # Las filas solo se leen si ya estaban en memoria o el manifiesto no
+            # trae el sketch o los totales por segmento
+            has_sketch = 'customers_hll' in entry and self.dataset.hll_precision == self.sketch_precision
+            has_segments = 'segment_sales' in entry
+            columns = None
+            if (self._columns is not None
+                    or (self.customer_sketch is not None and not has_sketch)
+                    or (self._segment_totals is not None and not has_segments)):
+                columns = self.read_partition(entry)
+            if self._columns is not None:
+                self._columns.extend(columns)
+            if self._segment_totals is not None:
+                if has_segments:
+                    self.merge_segment_totals(PartitionedDataset.entry_segment_totals(entry))
+                else:
+                    self.merge_segment_totals(self.aggregate_segments(columns))
+            if self.customer_sketch is not None:
+                if has_sketch:
+                    self.customer_sketch.merge(HyperLogLog.from_base64(entry['customers_hll']))
+                else:
+                    self.customer_sketch.update(columns.customer_id.values)
+        
+        return sum(entry['rows'] for entry in new_entries)
+    
+    @staticmethod
+    def dataset_replaced(previous, current):
+        """¿El manifiesto nuevo no es una ampliación del anterior?
+        
+        Al regenerar se reutilizan nombres de archivo, así que además del
+        identificador del dataset se comprueba que cada partición conocida
+        siga existiendo con las mismas filas y fechas.
+        """
+        if previous.dataset_id != current.dataset_id:
+            return True
+        entries = {entry['file']: entry for entry in current.partitions}
+        return any(
+            entries.get(entry['file'], {}).get(field) != entry[field]
+            for entry in previous.partitions
+            for field in ('rows', 'min_date', 'max_date')
+        )
+    
+    def reload_dataset(self):
+        """Rehacer agregados, sketch y cuarentena desde el manifiesto actual"""
+        self._interval_cache.clear()
+        self._segment_totals = None
+        self._columns = None
+        self._quarantined_partitions.clear()
+        self.quarantined = 0
+        if os.path.exists(self.quarantine_path):
+            os.remove(self.quarantine_path)
+        
+        self.daily_sales, self.daily_orders = self.dataset.daily_aggregates()
+        if self.sketch_precision:
+            self.customer_sketch = self.build_customer_sketch()
+        return self.dataset.totals()['total_orders']
+    
+    def add_to_aggregates(self, columns):
+        """Actualizar los agregados incrementales con columnas nuevas"""
+        self._interval_cache.clear()
+        daily_sales, daily_orders = self.aggregate_daily(columns)
+        for day, sales in daily_sales.items():
+            self.daily_sales[day] = self.daily_sales.get(day, 0) + sales
+            self.daily_orders[day] = self.daily_orders.get(day, 0) + daily_orders[day]
+        if self._segment_totals is not None:
+            self.merge_segment_totals(self.aggregate_segments(columns))
+        if self.customer_sketch is not None:
+            self.customer_sketch.update(columns.customer_id.values)
+    
+    def open_dataset(self, data_path):
+        """Abrir un directorio de particiones a partir de su manifiesto"""
+        try:
+            dataset = PartitionedDataset(data_path)
+        except FileNotFoundError:
+            self.logger.error(f"Dataset no encontrado: {data_path}")
+            raise
+        
+        totals = dataset.totals()
+        self.logger.info(
+            f"Dataset abierto: {totals['total_orders']} registros en "
+            f"{totals['partitions']} particiones desde {data_path}"
+        )
+        return dataset
+    
+    @staticmethod
+    def aggregate_daily(columns):
+        """Ventas y órdenes por día"""
+        dates = columns.sale_date
+        sums = group_sums(dates.codes, columns.total_sale, len(dates.values))
+        counts = dates.counts()
+        daily_sales = {dates.values[code]: sums[code] for code in counts}
+        daily_orders = {dates.values[code]: count for code, count in counts.items()}
+        return daily_sales, daily_orders
+    
+    @staticmethod
+    def aggregate_segments(columns):
+        """Segmento región_tipo -> [ventas, órdenes]"""
+        regions = columns.region
+        types = columns.customer_type
+        type_count = len(types.values)
+        segment_codes = [region * type_count + kind for region, kind in zip(regions.codes, types.codes)]
+        sums = group_sums(segment_codes, columns.total_sale, len(regions.values) * type_count)
+        return {
+            f"{regions.values[code // type_count]}_{types.values[code % type_count]}": [sums[code], count]
+            for code, count in Counter(segment_codes).items()
+        }
+    
+    def segment_totals(self):
+        """Ventas y órdenes por segmento de todo el dataset
+        
+        Se calculan una vez y luego se actualizan solo con las filas nuevas,
+        como los agregados diarios. En modo particionado salen del manifiesto
+        (solo se leen las particiones que no los traen).
+        """
+        if self._segment_totals is None:
+            if self.dataset is not None:
+                self._segment_totals, missing = self.dataset.segment_totals()
+                for entry in missing:
+                    self.merge_segment_totals(self.aggregate_segments(self.read_partition(entry)))
+            else:
+                self._segment_totals = self.aggregate_segments(self.columns)
+        return self._segment_totals
+    
+    def merge_segment_totals(self, segment_totals):
+        for segment, (sales, orders) in segment_totals.items():
+            totals = self._segment_totals.setdefault(segment, [0.0, 0])
+            totals[0] += sales
+            totals[1] += orders
+    
+    def columns_between(self, start_date=None, end_date=None):
+        """Columnas del rango de fechas (solo abre las particiones que lo solapan)"""
+        start_date = normalize_date(start_date)
+        end_date = normalize_date(end_date)
+        
+        if self.dataset is None or self._columns is not None:
+            columns = self.columns
+        else:
+            columns = SalesColumns()
+            for entry in self.dataset.partitions_between(start_date, end_date):
+                columns.extend(self.read_partition(entry))
+        
+        return columns.select_dates(start_date, end_date)
+    
+    def daily_between(self, start_date=None, end_date=None):
+        """Agregados diarios en el rango de fechas, sin leer filas"""
+        start_date = normalize_date(start_date)
+        end_date = normalize_date(end_date)
+        return {
+            day: sales for day, sales in self.daily_sales.items()
+            if (start_date is None or day >= start_date)
+            and (end_date is None or day <= end_date)
+        }
+    
+    def daily_segment_aggregates(self, start_date=None, end_date=None):
+        """Segmento región_tipo -> [(ventas, órdenes) por día con ventas]"""
+        columns = self.columns_between(start_date, end_date)
+        regions = columns.region
+        types = columns.customer_type
+        dates = columns.sale_date
+        type_count = len(types.values)
+        date_count = len(dates.values)
+        
+        keys = [(region * type_count + kind) * date_count + day for region, kind, day in
+                zip(regions.codes, types.codes, dates.codes)]
+        sums = group_sums(keys, columns.total_sale, len(regions.values) * type_count * date_count)
+        
+        segments = defaultdict(list)
+        for key, count in sorted(Counter(keys).items()):
+            segment, _ = divmod(key, date_count)
+            region, kind = divmod(segment, type_count)
+            segments[f"{regions.values[region]}_{types.values[kind]}"].append((sums[key], count))
+        return dict(sorted(segments.items()))
+    
+    def bootstrap_intervals(self, start_date=None, end_date=None):
+        """Intervalos de confianza bootstrap sobre agregados diarios
+        
+        Venta promedio y crecimiento semanal medio (sin leer filas).
+        """
+        cache_key = ('intervals', normalize_date(start_date), normalize_date(end_date))
+        if cache_key in self._interval_cache:
+            return self._interval_cache[cache_key]
+        
+        days = sorted(self.daily_between(start_date, end_date))
+        daily = [(self.daily_sales[day], self.daily_orders[day]) for day in days]
+        
+        weeks = defaultdict(list)
+        for day in days:
+            week_key = datetime.strptime(day, '%Y-%m-%d').strftime('%Y-%U')
+            weeks[week_key].append(self.daily_sales[day])
+        
+        intervals = {
+            'average_sale': self.bootstrap.interval(ratio_of_sums, daily),
+            'weekly_growth': self.bootstrap.interval(mean_growth, [weeks[key] for key in sorted(weeks)])
+        }
+        self._interval_cache[cache_key] = intervals
+        return intervals
+    
+    def segment_intervals(self, start_date=None, end_date=None):
+        """Intervalo bootstrap de la venta promedio de cada segmento (recorre las filas)"""
+        cache_key = ('segments', normalize_date(start_date), normalize_date(end_date))
+        if cache_key not in self._interval_cache:
+            segments = self.daily_segment_aggregates(start_date, end_date)
+            intervals = self.bootstrap.interval(segment_ratios, tuple(segments.values())) if segments else []
+            self._interval_cache[cache_key] = dict(zip(segments, intervals))
+        return self._interval_cache[cache_key]
+    
+    def build_customer_sketch(self):
+        """HyperLogLog de clientes distintos de todo el dataset"""
+        if self.shared is not None and self.shared.metadata.get('hll_precision') == self.sketch_precision:
+            return HyperLogLog.from_base64(self.shared.metadata['customers_hll'])
+        
+        if self.dataset is not None and self.dataset.hll_precision == self.sketch_precision:
+            sketch, missing = self.dataset.customer_sketch()
+            for entry in missing:
+                sketch.update(self.read_partition(entry).customer_id.values)
+            return sketch
+        
+        # El diccionario de la columna contiene cada cliente una sola vez
+        sketch = HyperLogLog(self.sketch_precision)
+        sketch.update(self.columns.customer_id.values)
+        return sketch
+    
+    def estimated_customers(self):
+        """Clientes distintos estimados en O(1) (exactos si no hay sketch)"""
+        if self.customer_sketch is None:
+            return self.customer_analysis()['total_customers']
+        return len(self.customer_sketch)
+    
+    def customer_sketches(self, dimension='day', start_date=None, end_date=None):
+        """Un HyperLogLog de clientes distintos por día, región o producto
+        
+        Los sketches de distintos analizadores, shards o ventanas se combinan
+        con ``HyperLogLog.merge`` sin volver a leer filas.
+        """
+        if dimension not in SKETCH_DIMENSIONS:
+            raise ValueError(f"Dimensión no soportada: {dimension}")
+        columns = self.columns_between(start_date, end_date)
+        keys = columns.columns[SKETCH_DIMENSIONS[dimension]]
+        customers = columns.customer_id
+        precision = self.sketch_precision or 12
+        
+        # Cada cliente se hashea una vez y las filas se recorren en streaming:
+        # la memoria es un sketch por clave, no los pares (clave, cliente)
+        hashes = [hash_value(customer) for customer in customers.values]
+        sketches = {}
+        for key_code, customer_code in zip(keys.codes, customers.codes):
+            sketch = sketches.get(key_code)
+            if sketch is None:
+                sketch = sketches[key_code] = HyperLogLog(precision)
+            sketch.add_hash(hashes[customer_code])
+        return dict(sorted((keys.values[code], sketch) for code, sketch in sketches.items()))
     
     def get_summary_stats(self):
         """Estadísticas resumen de las ventas"""
-        total_sales = sum(record['total_sale'] for record in self.data)
-        total_orders = len(self.data)
+        # Totales desde los agregados diarios (manifiestos en modo particionado)
+        total_sales = sum(self.daily_sales.values())
+        total_orders = sum(self.daily_orders.values())
         avg_sale = total_sales / total_orders if total_orders > 0 else 0
         
         # Encontrar rango de fechas
-        dates = [datetime.strptime(record['sale_date'], '%Y-%m-%d') for record in self.data]
-        min_date = min(dates)
-        max_date = max(dates)
+        min_date = min(self.daily_sales)
+        max_date = max(self.daily_sales)
         
         # Calcular ventas de hoy (simulado)
-        today = datetime.now().date()
-        sales_today = sum(
-            record['total_sale'] for record in self.data 
-            if datetime.strptime(record['sale_date'], '%Y-%m-%d').date() == today
-        )
+        today = datetime.now().date().isoformat()
+        sales_today = self.daily_sales.get(today, 0)
         
         return {
             'total_sales': total_sales,
             'average_sale': avg_sale,
             'total_orders': total_orders,
-            'date_range': f"{min_date.date()} to {max_date.date()}",
+            'date_range': f"{min_date} to {max_date}",
             'sales_today': sales_today
         }
     
-    def sales_by_category(self):
+    def sales_by_category(self, start_date=None, end_date=None):
         """Ventas por categoría"""
         category_sales = defaultdict(float)
-        for record in self.data:
+        for product, sales in self.product_sales(start_date, end_date).items():
             # Determinar categoría basada en el producto
-            product = record['product']
             if product in ['Laptop', 'Tablet', 'Smartphone', 'Monitor']:
                 category = 'Electrónicos'
             elif product in ['Mouse', 'Teclado', 'Auriculares']:
@@ -84,37 +521,63 @@ class SalesAnalyzer:
             else:
                 category = 'Dispositivos'
             
-            category_sales[category] += record['total_sale']
+            category_sales[category] += sales
         
         # Ordenar de mayor a menor
         return dict(sorted(category_sales.items(), key=lambda x: x[1], reverse=True))
     
-    def top_products(self, n=5):
+    def grouped_sales(self, field, start_date=None, end_date=None):
+        """Ventas totales por valor de una columna categórica"""
+        columns = self.columns_between(start_date, end_date)
+        column = columns.columns[field]
+        sums, counts = self.sums_by_code(columns, field)
+        return {column.values[code]: sums[code] for code in counts}
+    
+    def sums_by_code(self, columns, field, value_field='total_sale'):
+        """Suma de ``value_field`` y filas por código de ``field``"""
+        sums, counts = self.totals_by_code(columns, field, (value_field,))
+        return sums[0], counts
+    
+    def totals_by_code(self, columns, field, value_fields):
+        """Sumas de cada columna de ``value_fields`` y filas por código de ``field``
+        
+        Todas las columnas se agregan en una sola pasada. Sobre el dataset
+        compartido completo las filas se reparten entre los procesos del pool,
+        que agregan directamente sobre los segmentos.
+        """
+        if self.shared is not None and columns is self.shared.columns and self.bootstrap.workers > 1:
+            return parallel_group_totals(self.shared, field, value_fields,
+                                         self.bootstrap.pool(), self.bootstrap.workers)
+        column = columns.columns[field]
+        values = [columns.columns[value_field] for value_field in value_fields]
+        return group_sums_many(column.codes, values, len(column.values)), column.counts()
+    
+    def product_sales(self, start_date=None, end_date=None):
+        """Ventas totales por producto"""
+        return self.grouped_sales('product', start_date, end_date)
+    
+    def top_products(self, n=5, start_date=None, end_date=None):
         """Top N productos por ventas"""
-        product_sales = defaultdict(float)
-        for record in self.data:
-            product_sales[record['product']] += record['total_sale']
+        product_sales = self.product_sales(start_date, end_date)
         
         # Ordenar y tomar top N
         sorted_products = sorted(product_sales.items(), key=lambda x: x[1], reverse=True)
         return dict(sorted_products[:n])
     
-    def regional_analysis(self):
+    def regional_analysis(self, start_date=None, end_date=None):
         """Análisis por región"""
-        region_sales = defaultdict(float)
-        for record in self.data:
-            region_sales[record['region']] += record['total_sale']
+        region_sales = self.grouped_sales('region', start_date, end_date)
         
         return dict(sorted(region_sales.items(), key=lambda x: x[1], reverse=True))
     
-    def sales_trend_analysis(self):
+    def sales_trend_analysis(self, start_date=None, end_date=None):
         """Análisis de tendencias y crecimiento"""
-        # Agrupar ventas por semana
+        # Agrupar ventas por semana a partir de los agregados diarios
         weekly_sales = defaultdict(float)
-        for record in self.data:
-            sale_date = datetime.strptime(record['sale_date'], '%Y-%m-%d')
+        for day, sales in sorted(self.daily_between(start_date, end_date).items()):
+            sale_date = datetime.strptime(day, '%Y-%m-%d')
             week_key = sale_date.strftime('%Y-%U')  # Año-Semana
-            weekly_sales[week_key] += record['total_sale']
+            weekly_sales[week_key] += sales
         
         # Calcular crecimiento semanal
         weeks = sorted(weekly_sales.keys())
@@ -135,24 +598,48 @@ class SalesAnalyzer:
             'worst_week': min(weekly_sales, key=weekly_sales.get) if weekly_sales else None
         }
     
-    def customer_analysis(self):
+    def customer_analysis(self, start_date=None, end_date=None):
         """Análisis de comportamiento del cliente"""
-        customer_spending = defaultdict(float)
-        customer_frequency = defaultdict(int)
+        columns = self.columns_between(start_date, end_date)
+        sales = columns.total_sale
+        
+        # Agregación por código de cliente: gasto y compras
+        customer_codes = columns.customer_id.codes
+        customer_names = columns.customer_id.values
+        spending = group_sums(customer_codes, sales, len(customer_names))
+        frequency = Counter(customer_codes)
+        customers = {customer_names[code]: (spending[code], count) for code, count in frequency.items()}
         
-        for record in self.data:
-            # Usamos región + tipo como "cliente" para este ejemplo
-            customer_key = f"{record['region']}_{record['customer_type']}"
-            customer_spending[customer_key] += record['total_sale']
-            customer_frequency[customer_key] += 1
+        # Segmentos región + tipo de cliente
+        regions = columns.region
+        types = columns.customer_type
+        type_count = len(types.values)
+        segment_codes = [region * type_count + kind for region, kind in zip(regions.codes, types.codes)]
+        segment_sums = group_sums(segment_codes, sales, len(regions.values) * type_count)
+        segment_spending = {}
+        segment_frequency = {}
+        for code, count in Counter(segment_codes).items():
+            segment_key = f"{regions.values[code // type_count]}_{types.values[code % type_count]}"
+            segment_spending[segment_key] = segment_sums[code]
+            segment_frequency[segment_key] = count
         
         # Calcular métricas de cliente
-        if customer_spending:
-            avg_order_value = statistics.mean(customer_spending.values())
-            max_spender = max(customer_spending, key=customer_spending.get)
-            most_frequent = max(customer_frequency, key=customer_frequency.get)
+        if customers:
+            total_spend = sum(totals[0] for totals in customers.values())
+            total_orders = sum(totals[1] for totals in customers.values())
+            avg_order_value = statistics.mean(segment_spending.values())
+            avg_customer_spend = total_spend / len(customers)
+            avg_frequency = total_orders / len(customers)
+            top_customer = max(customers, key=lambda key: customers[key][0])
+            most_frequent_customer = max(customers, key=lambda key: customers[key][1])
+            max_spender = max(segment_spending, key=segment_spending.get)
+            most_frequent = max(segment_frequency, key=segment_frequency.get)
         else:
             avg_order_value = 0
+            avg_customer_spend = 0
+            avg_frequency = 0
+            top_customer = None
+            most_frequent_customer = None
             max_spender = None
             most_frequent = None
         
@@ -160,29 +647,49 @@ class SalesAnalyzer:
             'average_order_value': round(avg_order_value, 2),
             'top_spending_segment': max_spender,
             'most_frequent_segment': most_frequent,
-            'customer_segments': len(customer_spending),
-            'total_customers': sum(customer_frequency.values())
+            'customer_segments': len(segment_spending),
+            'total_customers': len(customers),
+            'average_customer_spend': round(avg_customer_spend, 2),
+            'average_purchase_frequency': round(avg_frequency, 2),
+            'top_customer': top_customer,
+            'most_frequent_customer': most_frequent_customer
+        }
+    
+    def product_aggregates(self, start_date=None, end_date=None):
+        """Agregación por producto: producto -> [ingresos, unidades, suma de precios, órdenes]"""
+        columns = self.columns_between(start_date, end_date)
+        products = columns.product
+        (revenue, units, prices), counts = self.totals_by_code(
+            columns, 'product', ('total_sale', 'quantity', 'unit_price'))
+        return {
+            products.values[code]: [revenue[code], int(units[code]), prices[code], orders]
+            for code, orders in counts.items()
+        }
+    
+    def product_ranking(self, start_date=None, end_date=None):
+        """Ranking por ingresos en columnas compactas (para tablas virtualizadas)"""
+        ranked = sorted(self.product_aggregates(start_date, end_date).items(),
+                        key=lambda item: item[1][0], reverse=True)
+        return {
+            'product': [product for product, _ in ranked],
+            'total_revenue': array('d', (totals[0] for _, totals in ranked)),
+            'units_sold': array('q', (totals[1] for _, totals in ranked)),
+            'average_price': array('d', (totals[2] / totals[3] for _, totals in ranked)),
+            'total_orders': array('q', (totals[3] for _, totals in ranked))
         }
     
     def product_performance_metrics(self):
         """Métricas avanzadas de desempeño de productos"""
         product_metrics = {}
         
-        for product in set(record['product'] for record in self.data):
-            product_sales = [r for r in self.data if r['product'] == product]
-            
-            if product_sales:
-                total_revenue = sum(r['total_sale'] for r in product_sales)
-                total_units = sum(r['quantity'] for r in product_sales)
-                avg_price = statistics.mean(r['unit_price'] for r in product_sales)
-                
-                product_metrics[product] = {
-                    'total_revenue': round(total_revenue, 2),
-                    'units_sold': total_units,
-                    'average_price': round(avg_price, 2),
-                    'total_orders': len(product_sales),
-                    'revenue_per_order': round(total_revenue / len(product_sales), 2)
-                }
+        for product, (total_revenue, total_units, price_sum, orders) in self.product_aggregates().items():
+            product_metrics[product] = {
+                'total_revenue': round(total_revenue, 2),
+                'units_sold': total_units,
+                'average_price': round(price_sum / orders, 2),
+                'total_orders': orders,
+                'revenue_per_order': round(total_revenue / orders, 2)
+            }
         
         # Rankings
         sorted_by_revenue = sorted(product_metrics.items(), 
@@ -194,26 +701,41 @@ class SalesAnalyzer:
             'best_selling_product': sorted_by_revenue[0][0] if sorted_by_revenue else None
         }
     
-    def predictive_insights(self):
+    def predictive_insights(self, start_date=None, end_date=None):
         """Insights predictivos simples"""
         # Análisis de estacionalidad básico
         monthly_sales = defaultdict(float)
-        for record in self.data:
-            sale_date = datetime.strptime(record['sale_date'], '%Y-%m-%d')
-            month_key = sale_date.strftime('%Y-%m')
-            monthly_sales[month_key] += record['total_sale']
+        for day, sales in sorted(self.daily_between(start_date, end_date).items()):
+            month_key = day[:7]  # Año-Mes
+            monthly_sales[month_key] += sales
         
-        # Predecir próximo mes (promedio simple)
+        # Predecir próximo mes (promedio simple de los últimos 3 meses)
         if len(monthly_sales) >= 2:
-            last_months = list(monthly_sales.values())[-3:]  # Últimos 3 meses
-            predicted_next = statistics.mean(last_months)
-            confidence = 'high' if len(monthly_sales) >= 3 else 'medium'
+            forecast = self.forecast_interval(start_date, end_date)
+            predicted_next = forecast['estimate']
+            confidence, confidence_score = confidence_label(forecast, self.confidence_threshold)
+            prediction_interval = (round(forecast['low'], 2), round(forecast['high'], 2))
         else:
             predicted_next = sum(monthly_sales.values()) / len(monthly_sales) if monthly_sales else 0
             confidence = 'low'
+            confidence_score = 0.0
+            prediction_interval = None
         
         return {
             'monthly_trend': dict(monthly_sales),
             'predicted_next_month': round(predicted_next, 2),
-            'confidence': confidence
-        }
\ No newline at end of file
+            'prediction_interval': prediction_interval,
+            'confidence': confidence,
+            'confidence_score': round(confidence_score, 2)
+        }
+    
+    def forecast_interval(self, start_date=None, end_date=None):
+        """Intervalo bootstrap del pronóstico del próximo mes (días remuestreados por mes)"""
+        cache_key = ('forecast', normalize_date(start_date), normalize_date(end_date))
+        if cache_key not in self._interval_cache:
+            months = defaultdict(list)
+            for day, sales in sorted(self.daily_between(start_date, end_date).items()):
+                months[day[:7]].append(sales)
+            last_months = [months[key] for key in sorted(months)[-3:]]  # Últimos 3 meses
+            self._interval_cache[cache_key] = self.bootstrap.interval(mean_of_totals, last_months)
+        return self._interval_cache[cache_key]
\ No newline at end of file
@@ -11,10 +11,27 @@ class AppConfig:
     # Configuración de datos
     DEFAULT_RECORDS = 2000
     DATA_RETENTION_DAYS = 365
+    DATA_PATH = 'data/sample_sales.csv'
+    DATASET_DIR = None  # Directorio particionado (p.ej. 'data/sales'); reemplaza DATA_PATH
+    PARTITION_GRANULARITY = 'month'  # 'day' o 'month'
+    SHARED_DATASET = None  # Nombre de un dataset en memoria compartida (ver shared_dataset.py); reemplaza los anteriores
     
     # Configuración de análisis
     TREND_ANALYSIS_DAYS = 90
-    PREDICTION_CONFIDENCE_THRESHOLD = 0.7
+    PREDICTION_CONFIDENCE_THRESHOLD = 0.7  # Puntuación mínima (1 - semiancho relativo) para 'high'
+    BOOTSTRAP_RESAMPLES = 1000
+    BOOTSTRAP_CONFIDENCE_LEVEL = 0.95
+    BOOTSTRAP_SEED = 42
+    BOOTSTRAP_WORKERS = None  # None = un proceso por CPU
+    ENABLE_CUSTOMER_SKETCH = True  # HyperLogLog para clientes distintos
+    HLL_PRECISION = 12  # 4096 registros, error ~1.6%
+    
+    # Actualización automática (modo en vivo)
+    AUTO_REFRESH_ENABLED = False
+    AUTO_REFRESH_INTERVAL_MS = 1000  # Sondeo del archivo de datos
+    AUTO_REFRESH_DEBOUNCE_MS = 300  # Espera tras la última escritura
+    AUTO_REFRESH_UI_POLL_MS = 50  # Revisión de eventos en el hilo de Tk
+    AUTO_REFRESH_VIEWS_MS = 5000  # Mínimo entre recálculos de vistas, tablas e intervalos
     
     # Configuración de UI
     THEME = "default"
@@ -31,5 +48,7 @@ class AppConfig:
             'app_name': cls.APP_NAME,
             'version': cls.VERSION,
             'default_records': cls.DEFAULT_RECORDS,
+            'data_source': (f"shm://{cls.SHARED_DATASET}" if cls.SHARED_DATASET
+                            else cls.DATASET_DIR or cls.DATA_PATH),
             'theme': cls.THEME
         }
\ No newline at end of file
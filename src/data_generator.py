@@ -2,9 +2,36 @@ import csv
 import random
 from datetime import datetime, timedelta
 import os
+import shutil
+from partitioned_dataset import FIELDNAMES, PartitionedDataset
 
-def generate_sales_data(num_records=2000):
-    """Genera datos de ventas sintéticos SIN PANDAS"""
+def customer_profile(customer_number, regions, customer_types):
+    """Región y tipo estables para cada cliente (dependen solo de su número)"""
+    rng = random.Random(customer_number)
+    return rng.choice(regions), rng.choice(customer_types)
+
+def replace_directory(source, destination):
+    """Sustituir ``destination`` por ``source`` (el anterior se borra al final)"""
+    previous = destination + '.anterior'
+    if os.path.exists(previous):
+        shutil.rmtree(previous)
+    if os.path.exists(destination):
+        os.replace(destination, previous)
+    os.replace(source, destination)
+    if os.path.exists(previous):
+        shutil.rmtree(previous)
+
+def generate_sales_data(num_records=2000, dataset_dir=None, granularity='month',
+                        num_customers=None, replace=False, csv_path='data/sample_sales.csv',
+                        hll_precision=12):
+    """Genera datos de ventas sintéticos SIN PANDAS
+    
+    Con ``dataset_dir`` los registros se añaden como particiones nuevas del
+    dataset en lugar de reescribir ``csv_path``; con ``replace`` el
+    dataset se genera aparte y sustituye al existente. ``hll_precision`` es
+    la de los sketches de clientes de un dataset nuevo (uno existente
+    conserva la de su manifiesto).
+    """
     
     products = ['Laptop', 'Mouse', 'Teclado', 'Monitor', 'Tablet', 'Smartphone', 'Auriculares', 'Impresora']
     categories = ['Electrónicos', 'Accesorios', 'Dispositivos']
@@ -12,9 +39,22 @@ def generate_sales_data(num_records=2000):
     customer_types = ['Individual', 'Empresa', 'Gobierno']
     
     # Generar fechas de los últimos 90 días
+    num_customers = num_customers or max(50, num_records // 4)
+    
     end_date = datetime.now()
     start_date = end_date - timedelta(days=90)
     
+    dataset = None
+    first_id = 1000
+    if dataset_dir:
+        dataset_dir = os.path.normpath(dataset_dir)
+        target_dir = dataset_dir + '.nuevo' if replace else dataset_dir
+        if replace and os.path.exists(target_dir):
+            shutil.rmtree(target_dir)
+        dataset = PartitionedDataset(target_dir, granularity=granularity, create=True,
+                                     hll_precision=hll_precision)
+        first_id += dataset.totals()['total_orders']
+    
     data = []
     for i in range(num_records):
         product = random.choice(products)
@@ -27,36 +67,51 @@ def generate_sales_data(num_records=2000):
         days_diff = random.randint(0, 89)
         sale_date = start_date + timedelta(days=days_diff)
         
+        customer_number = random.randint(1, num_customers)
+        region, customer_type = customer_profile(customer_number, regions, customer_types)
+        
         record = {
-            'order_id': f'ORD_{1000 + i}',
+            'order_id': f'ORD_{first_id + i}',
+            'customer_id': f'CUST_{customer_number:06d}',
             'product': product,
             'category': category,
             'quantity': quantity,
             'unit_price': round(unit_price, 2),
             'sale_date': sale_date.strftime('%Y-%m-%d'),
-            'region': random.choice(regions),
-            'customer_type': random.choice(customer_types),
+            'region': region,
+            'customer_type': customer_type,
             'total_sale': round(total_sale, 2)
         }
         data.append(record)
     
-    # Guardar como CSV
-    os.makedirs('data', exist_ok=True)
-    with open('data/sample_sales.csv', 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['order_id', 'product', 'category', 'quantity', 'unit_price', 
-                     'sale_date', 'region', 'customer_type', 'total_sale']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    if dataset is not None:
+        # Guardar como particiones nuevas
+        new_partitions = dataset.append(data)
+        if replace:
+            replace_directory(target_dir, dataset_dir)
+            destination = f"{len(new_partitions)} particiones en {dataset_dir} (reemplazado)"
+        else:
+            destination = f"{len(new_partitions)} particiones nuevas en {dataset_dir}"
+    else:
+        # Guardar como CSV
+        if os.path.dirname(csv_path):
+            os.makedirs(os.path.dirname(csv_path), exist_ok=True)
+        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(data)
+        destination = csv_path
     
     # Mostrar resumen
     total_sales = sum(record['total_sale'] for record in data)
     unique_products = len(set(record['product'] for record in data))
+    unique_customers = len(set(record['customer_id'] for record in data))
     
     print("🔄 Generando datos de ventas sintéticos...")
-    print(f"✅ Datos generados: {len(data)} registros guardados en data/sample_sales.csv")
+    print(f"✅ Datos generados: {len(data)} registros guardados en {destination}")
     print(f"📊 Resumen:")
     print(f"   - Productos: {unique_products}")
+    print(f"   - Clientes: {unique_customers}")
     print(f"   - Ventas totales: ${total_sales:,.2f}")
     print(f"   - Período: {start_date.date()} a {end_date.date()}")
     
@@ -0,0 +1,355 @@
+"""
+Lector rápido de CSV de ventas hacia columnas tipadas.
+
+Lee el archivo en bloques grandes, separa campos por posición según la
+cabecera (sin un dict por fila) y convierte cada columna en lote. Las filas
+inválidas no abortan la carga: se escriben en un archivo de cuarentena con
+su número de línea y el motivo.
+
+Un campo entre comillas puede contener saltos de línea: los bloques solo se
+cortan en un salto con un número par de comillas por delante, y esos
+registros de varias líneas se separan con el módulo csv.
+"""
+
+import csv
+import logging
+import os
+import time
+from array import array
+from datetime import date
+from itertools import repeat
+
+from sales_columns import CATEGORICAL_FIELDS, NUMERIC_FIELDS, TEXT_FIELDS, SalesColumns
+
+BLOCK_SIZE = 1 << 22  # 4 MiB
+REQUIRED_FIELDS = ['order_id', 'product', 'category', 'quantity', 'unit_price',
+                   'sale_date', 'region', 'customer_type', 'total_sale']
+QUARANTINE_FIELDS = ['line_number', 'error', 'raw']
+
+logger = logging.getLogger(__name__)
+
+
+class IngestResult:
+    def __init__(self, columns, offset, fieldnames, line_number, quarantined):
+        self.columns = columns
+        self.offset = offset  # byte donde continuar una lectura incremental
+        self.fieldnames = fieldnames
+        self.line_number = line_number  # última línea procesada
+        self.quarantined = quarantined
+
+
+class Quarantine:
+    """Archivo CSV (abierto solo si hace falta) con las filas descartadas
+
+    Sin ``append`` se descarta el contenido anterior: una carga completa
+    vuelve a encontrar las mismas filas y no debe duplicarlas.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._writer = None
+        if path is not None and not append and os.path.exists(path):
+            os.remove(path)
+
+    def add(self, line_number, error, raw):
+        self.count += 1
+        if self.path is None:
+            return
+        if self._writer is None:
+            self._file = open(self.path, 'a', newline='', encoding='utf-8')
+            if self._file.tell() == 0:
+                csv.writer(self._file).writerow(QUARANTINE_FIELDS)
+            self._writer = csv.writer(self._file)
+        self._writer.writerow([line_number, error, raw])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def parse_fieldnames(header_line):
+    """Cabecera -> nombres de columna, validando que estén los obligatorios"""
+    fieldnames = next(csv.reader([header_line.lstrip('\ufeff').rstrip('\r\n')]))
+    missing = [name for name in REQUIRED_FIELDS if name not in fieldnames]
+    if missing:
+        raise ValueError(f"Columnas obligatorias ausentes: {', '.join(missing)}")
+    return fieldnames
+
+
+def valid_date(value):
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return len(value) == 10
+
+
+def complete_records_end(data):
+    """Fin del último registro completo del bloque (0 si no hay ninguno)
+
+    Es el último salto de línea fuera de comillas: el número de comillas
+    anteriores es par (las comillas escapadas ``""`` no cambian la paridad).
+    """
+    cut = data.rfind(b'\n') + 1
+    quotes = data.count(b'"', 0, cut)
+    while quotes % 2:
+        previous = data.rfind(b'\n', 0, cut - 1) + 1
+        quotes -= data.count(b'"', previous, cut)
+        cut = previous
+    return cut
+
+
+def read_sales_csv(path, offset=0, fieldnames=None, quarantine_path=None,
+                   first_line=1, complete_lines_only=False, block_size=BLOCK_SIZE,
+                   quarantine_append=None):
+    """Leer un CSV de ventas (o lo añadido desde ``offset``) a ``SalesColumns``
+
+    Con ``offset=0`` se lee la cabecera; si no, debe pasarse ``fieldnames``
+    y ``first_line`` (número de la primera línea a leer). Con
+    ``complete_lines_only`` se ignora una última línea sin salto de línea
+    (posiblemente a medio escribir).
+
+    La cuarentena se reescribe en una lectura completa y se amplía en una
+    incremental, salvo que ``quarantine_append`` indique otra cosa.
+    """
+    columns = SalesColumns()
+    if quarantine_append is None:
+        quarantine_append = offset != 0
+    quarantine = Quarantine(quarantine_path, append=quarantine_append)
+    line_number = first_line - 1
+
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            if offset == 0:
+                header = f.readline()
+                offset = len(header)
+                line_number += 1
+                fieldnames = parse_fieldnames(header.decode('utf-8'))
+
+            positions = {name: i for i, name in enumerate(fieldnames)}
+            parser = BlockParser(columns, positions, len(fieldnames), quarantine)
+
+            tail = b''
+            while True:
+                block = f.read(block_size)
+                data = tail + block
+                if not block:
+                    # Último registro sin salto (o con comillas sin cerrar)
+                    if data and not complete_lines_only:
+                        parser.parse(data, line_number + 1)
+                        offset += len(data)
+                        line_number += data.count(b'\n') + (not data.endswith(b'\n'))
+                    break
+
+                cut = complete_records_end(data)
+                if cut:
+                    parser.parse(data[:cut], line_number + 1)
+                    line_number += data.count(b'\n', 0, cut)
+                    offset += cut
+                tail = data[cut:]
+    finally:
+        quarantine.close()
+
+    if quarantine.count:
+        logger.warning(f"{quarantine.count} filas inválidas en cuarentena: {quarantine_path}")
+    return IngestResult(columns, offset, fieldnames, line_number, quarantine.count)
+
+
+class BlockParser:
+    """Convierte bloques de líneas completas en columnas tipadas"""
+
+    def __init__(self, columns, positions, field_count, quarantine):
+        self.columns = columns
+        self.positions = positions
+        self.field_count = field_count
+        self.quarantine = quarantine
+        self.checked_dates = {}
+
+    def parse(self, data, first_line):
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            text = self._decode_lines(data, first_line)
+
+        lines = text.replace('\r', '').split('\n')
+        if lines and lines[-1] == '':
+            lines.pop()
+        if not lines:
+            return
+
+        # Camino rápido: todas las líneas con el número exacto de separadores.
+        # Se separa el bloque entero de una vez y cada columna es un slice.
+        separators = self.field_count - 1
+        if '"' not in text and set(map(str.count, lines, repeat(','))) == {separators}:
+            flat = ','.join(lines).split(',')
+            fields = [flat[i::self.field_count] for i in range(self.field_count)]
+            self._convert(fields, range(first_line, first_line + len(lines)))
+            return
+
+        if '"' in text:
+            # Un salto de línea entre comillas no termina el registro
+            records = self.split_records(lines)
+        else:
+            records = ((line, 1) for line in lines)
+
+        good_rows = []
+        good_lines = []
+        line_number = first_line
+        for record, line_count in records:
+            row, error = self.split_fields(record)
+            if error is not None:
+                self.quarantine.add(line_number, error, record)
+            elif len(row) == self.field_count:
+                good_rows.append(row)
+                good_lines.append(line_number)
+            elif any(row):
+                self.quarantine.add(line_number,
+                                    f"{len(row)} campos, se esperaban {self.field_count}",
+                                    record)
+            line_number += line_count
+        if good_rows:
+            self._convert([list(column) for column in zip(*good_rows)], good_lines)
+
+    @staticmethod
+    def split_records(lines):
+        """Agrupar líneas en registros: (texto, número de líneas) por registro
+
+        Mientras las comillas acumuladas sean impares el registro continúa en
+        la línea siguiente (mismo criterio que ``complete_records_end``).
+        """
+        pending = []
+        quotes = 0
+        for line in lines:
+            pending.append(line)
+            quotes += line.count('"')
+            if quotes % 2 == 0:
+                yield '\n'.join(pending), len(pending)
+                pending = []
+                quotes = 0
+        if pending:
+            yield '\n'.join(pending), len(pending)
+
+    @staticmethod
+    def split_fields(record):
+        """Campos de un registro, o el motivo por el que no se puede separar"""
+        if '"' not in record:
+            return record.split(','), None
+        if record.count('"') % 2:
+            return None, "comillas sin cerrar"
+        try:
+            # Campos entre comillas: se delega en el módulo csv
+            return next(csv.reader([record])), None
+        except csv.Error as e:
+            return None, f"comillas inválidas: {e}"
+
+    def _decode_lines(self, data, first_line):
+        """Decodificar línea a línea enviando a cuarentena las que no son UTF-8"""
+        decoded = []
+        for i, raw in enumerate(data.split(b'\n')):
+            try:
+                decoded.append(raw.decode('utf-8'))
+            except UnicodeDecodeError as e:
+                self.quarantine.add(first_line + i, f"UTF-8 inválido: {e}", raw.decode('utf-8', 'replace'))
+                decoded.append('')
+        return '\n'.join(decoded)
+
+    def _convert(self, fields, line_numbers):
+        """Convertir columnas de texto (una lista por campo) en lote"""
+        positions = self.positions
+        try:
+            numeric = {
+                name: array(typecode, map(int if typecode == 'q' else float, fields[positions[name]]))
+                for name, typecode in NUMERIC_FIELDS.items()
+            }
+            bad_dates = self._bad_dates(fields[positions['sale_date']])
+        except ValueError:
+            numeric, bad_dates = None, None
+
+        if numeric is None or bad_dates:
+            # Algún valor inválido en el lote: separar fila a fila y reintentar
+            rows, line_numbers = self._filter_rows(zip(*fields), line_numbers)
+            if rows:
+                self._convert([list(column) for column in zip(*rows)], line_numbers)
+            return
+
+        for name, values in numeric.items():
+            self.columns.columns[name].extend(values)
+        for name in TEXT_FIELDS:
+            self.columns.columns[name].extend(fields[positions[name]])
+        for name in CATEGORICAL_FIELDS:
+            if name in positions:
+                values = fields[positions[name]]
+            if name == 'customer_id' and (name not in positions or '' in values):
+                # Sin customer_id (CSV antiguo) se usa región + tipo como cliente
+                segments = (f"{region}_{customer_type}" for region, customer_type in
+                            zip(fields[positions['region']], fields[positions['customer_type']]))
+                if name in positions:
+                    values = [value or segment for value, segment in zip(values, segments)]
+                else:
+                    values = list(segments)
+            self.columns.columns[name].encode(values)
+
+    def _bad_dates(self, dates):
+        """Fechas inválidas entre las distintas del lote (cada una se valida una vez)"""
+        checked = self.checked_dates
+        distinct = set(dates)
+        for value in distinct.difference(checked):
+            checked[value] = valid_date(value)
+        return {value for value in distinct if not checked[value]}
+
+    def _filter_rows(self, rows, line_numbers):
+        good_rows = []
+        good_lines = []
+        positions = self.positions
+        for row, line_number in zip(rows, line_numbers):
+            try:
+                for name, typecode in NUMERIC_FIELDS.items():
+                    (int if typecode == 'q' else float)(row[positions[name]])
+                if self._bad_dates([row[positions['sale_date']]]):
+                    raise ValueError(f"fecha inválida: {row[positions['sale_date']]!r}")
+            except ValueError as e:
+                self.quarantine.add(line_number, str(e), ','.join(row))
+                continue
+            good_rows.append(row)
+            good_lines.append(line_number)
+        return good_rows, good_lines
+
+
+def read_sales_csv_legacy(path):
+    """Cargador anterior (csv.DictReader + conversión por fila), para comparar"""
+    data = []
+    with open(path, 'r', encoding='utf-8') as csvfile:
+        for row in csv.DictReader(csvfile):
+            row['quantity'] = int(row['quantity'])
+            row['unit_price'] = float(row['unit_price'])
+            row['total_sale'] = float(row['total_sale'])
+            data.append(row)
+    return data
+
+
+def benchmark(path, include_legacy=True):
+    """Filas por segundo del lector rápido frente al anterior"""
+    results = {}
+    loaders = [('rapido', lambda: len(read_sales_csv(path).columns))]
+    if include_legacy:
+        loaders.append(('anterior', lambda: len(read_sales_csv_legacy(path))))
+
+    for name, loader in loaders:
+        start = time.perf_counter()
+        rows = loader()
+        elapsed = time.perf_counter() - start
+        results[name] = {'rows': rows, 'seconds': round(elapsed, 2),
+                         'rows_per_sec': round(rows / elapsed)}
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    legacy = '--sin-anterior' not in sys.argv
+    for csv_path in [arg for arg in sys.argv[1:] if not arg.startswith('--')]:
+        for loader, stats in benchmark(csv_path, include_legacy=legacy).items():
+            print(f"{csv_path} [{loader}]: {stats['rows']:,} filas en {stats['seconds']}s "
+                  f"-> {stats['rows_per_sec']:,} filas/s")
@@ -0,0 +1,88 @@
+"""
+Vigilancia de archivos por sondeo de ``os.stat``.
+
+Un hilo en segundo plano compara tamaño y fecha de modificación cada
+``interval`` segundos. Las ráfagas de escrituras se agrupan (debounce): el
+callback se invoca una sola vez cuando el archivo lleva ``debounce`` segundos
+sin cambiar, o a los ``max_wait`` segundos del primer cambio si las
+escrituras no paran. El callback se ejecuta en el hilo del vigilante; las
+interfaces Tk deben pasar el evento al hilo principal (p.ej. con una cola y
+``after``).
+"""
+
+import logging
+import os
+import threading
+import time
+
+
+def file_signature(path):
+    """(tamaño, mtime en ns) o None si el archivo no existe"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FileWatcher:
+    def __init__(self, path, callback, interval=1.0, debounce=0.3, max_wait=None):
+        self.path = path
+        self.callback = callback
+        self.interval = interval
+        self.debounce = debounce
+        # Con escrituras continuas se notifica igualmente pasado este tiempo
+        self.max_wait = max_wait if max_wait is not None else interval + debounce
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='FileWatcher', daemon=True)
+            self._thread.start()
+            self.logger.info(f"Vigilando {self.path} cada {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + self.debounce + 1)
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        last_signature = file_signature(self.path)
+        pending = None  # firma del último cambio aún no notificado
+        pending_since = 0.0
+        first_change = None  # (instante, mtime) del primer cambio aún no notificado
+
+        while not self._stop.is_set():
+            # Mientras hay un cambio pendiente se sondea más a menudo
+            self._stop.wait(min(self.interval, self.debounce) if first_change else self.interval)
+            signature = file_signature(self.path)
+            now = time.monotonic()
+
+            if signature != (pending if first_change else last_signature):
+                if first_change is None:
+                    first_change = (now, signature[1] / 1e9 if signature else time.time())
+                pending = signature
+                pending_since = now
+            if first_change is None:
+                continue
+
+            # Se notifica tras ``debounce`` sin cambios o, si no paran, tras ``max_wait``
+            if now - pending_since < self.debounce and now - first_change[0] < self.max_wait:
+                continue
+            last_signature = pending
+            changed_at = first_change[1]
+            first_change = None
+            if signature is not None:
+                try:
+                    # mtime del primer cambio sin notificar, para medir la latencia
+                    self.callback(changed_at)
+                except Exception as e:
+                    self.logger.error(f"Error notificando cambio en {self.path}: {e}")
@@ -2,19 +2,31 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 import os
+import queue
+import time
 from datetime import datetime
 from config import AppConfig
 from data_generator import generate_sales_data
 from analysis_engine import SalesAnalyzer
+from resampling import BootstrapEngine
 from visualization import SalesVisualizer
+from file_watcher import FileWatcher
+from shared_dataset import SHARED_PREFIX
 class SalesAnalysisPro:
     def __init__(self, root):
         self.root = root
         self.config = AppConfig()
+        self.current_view = None
+        self.watcher = None
+        self.live_events = queue.Queue()
         self.setup_app()
         self.initialize_data()
         self.create_main_interface()
         
+        if self.config.AUTO_REFRESH_ENABLED:
+            self.live_mode.set(True)
+            self.start_live_mode()
+        
         # Log de inicio
         self.logger.info(f"Aplicación {self.config.APP_NAME} v{self.config.VERSION} iniciada")
     
@@ -36,27 +48,67 @@ class SalesAnalysisPro:
             )
         self.logger = logging.getLogger(__name__)
     
+    @property
+    def data_source(self):
+        """CSV único, directorio particionado o dataset compartido según la configuración"""
+        if self.config.SHARED_DATASET:
+            return SHARED_PREFIX + self.config.SHARED_DATASET
+        return self.config.DATASET_DIR or self.config.DATA_PATH
+    
+    def create_analyzer(self):
+        """Analizador sobre el origen de datos configurado"""
+        precision = self.config.HLL_PRECISION if self.config.ENABLE_CUSTOMER_SKETCH else None
+        return SalesAnalyzer(self.data_source, sketch_precision=precision,
+                             bootstrap=self.bootstrap,
+                             confidence_threshold=self.config.PREDICTION_CONFIDENCE_THRESHOLD)
+    
+    def generate_data(self, replace=False):
+        """Generar datos de demostración en el origen configurado
+        
+        Con ``replace`` un dataset particionado se sustituye en lugar de
+        recibir particiones nuevas.
+        """
+        generate_sales_data(self.config.DEFAULT_RECORDS,
+                            dataset_dir=self.config.DATASET_DIR,
+                            granularity=self.config.PARTITION_GRANULARITY,
+                            replace=replace,
+                            csv_path=self.config.DATA_PATH,
+                            hll_precision=self.config.HLL_PRECISION)
+    
     def initialize_data(self):
         """Inicialización y verificación de datos"""
+        # Pool de procesos compartido por los intervalos bootstrap
+        self.bootstrap = BootstrapEngine(n_resamples=self.config.BOOTSTRAP_RESAMPLES,
+                                         confidence_level=self.config.BOOTSTRAP_CONFIDENCE_LEVEL,
+                                         seed=self.config.BOOTSTRAP_SEED,
+                                         workers=self.config.BOOTSTRAP_WORKERS)
+        
         try:
-            self.analyzer = SalesAnalyzer()
+            self.analyzer = self.create_analyzer()
             self.logger.info("Datos cargados exitosamente")
         except FileNotFoundError:
+            if self.config.SHARED_DATASET:
+                messagebox.showerror("Error", f"No existe el dataset compartido '{self.config.SHARED_DATASET}'")
+                self.root.destroy()
+                return
             self.logger.info("Generando datos iniciales...")
             response = messagebox.askyesno(
                 "Datos No Encontrados", 
                 "No se encontraron datos de ventas. ¿Generar datos de demostración?"
             )
             if response:
-                generate_sales_data(self.config.DEFAULT_RECORDS)
-                self.analyzer = SalesAnalyzer()
+                self.generate_data()
+                self.analyzer = self.create_analyzer()
                 messagebox.showinfo("Éxito", 
                                   f"Se generaron {self.config.DEFAULT_RECORDS} registros de demostración")
             else:
                 self.root.destroy()
                 return
         
-        self.visualizer = SalesVisualizer(self.analyzer)
+        self.visualizer = self.create_visualizer()
+    
+    def create_visualizer(self):
+        return SalesVisualizer(self.analyzer, live_refresh_ms=self.config.AUTO_REFRESH_VIEWS_MS)
     
     def create_main_interface(self):
         """Interfaz principal mejorada"""
@@ -87,6 +139,9 @@ class SalesAnalysisPro:
         file_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Archivo", menu=file_menu)
         file_menu.add_command(label="Regenerar Datos", command=self.regenerate_data)
+        self.live_mode = tk.BooleanVar(value=False)
+        file_menu.add_checkbutton(label="Modo en Vivo", variable=self.live_mode,
+                                  command=self.toggle_live_mode)
         file_menu.add_separator()
         file_menu.add_command(label="Salir", command=self.root.quit)
         
@@ -111,9 +166,22 @@ class SalesAnalysisPro:
                           style='Title.TLabel')
         header.pack(pady=10)
         
-        # Métricas en tiempo real
+        # Métricas en tiempo real (etiquetas fijas, solo cambian sus valores)
+        self.metric_vars = {}
+        for title in ("Ventas Hoy", "Crecimiento", "Órdenes", "Clientes"):
+            metric_frame = ttk.Frame(sidebar)
+            metric_frame.pack(fill=tk.X, padx=10, pady=3)
+            
+            self.metric_vars[title] = tk.StringVar()
+            ttk.Label(metric_frame, text=title, width=12).pack(side=tk.LEFT)
+            ttk.Label(metric_frame, textvariable=self.metric_vars[title],
+                      style='Value.TLabel').pack(side=tk.RIGHT)
         self.update_sidebar_metrics(sidebar)
         
+        self.live_status = tk.StringVar()
+        ttk.Label(sidebar, textvariable=self.live_status,
+                  style='Success.TLabel').pack(padx=10, anchor=tk.W)
+        
         # Botones de acción rápida
         actions_frame = ttk.Frame(sidebar)
         actions_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -129,30 +197,21 @@ class SalesAnalysisPro:
     
     def update_sidebar_metrics(self, sidebar):
         """Actualizar métricas en el sidebar"""
-        # Limpiar métricas anteriores
-        for widget in sidebar.winfo_children():
-            if isinstance(widget, ttk.Frame) and widget != sidebar.winfo_children()[0]:
-                widget.destroy()
-        
         stats = self.analyzer.get_summary_stats()
         trend = self.analyzer.sales_trend_analysis()
         
-        unique_customers = len(set([f"{r['region']}_{r['customer_type']}" for r in self.analyzer.data]))
+        unique_customers = self.analyzer.estimated_customers()
         
         metrics = [
             ("Ventas Hoy", f"${stats.get('sales_today', 0):,.0f}"),
             ("Crecimiento", f"{trend['average_weekly_growth']}%"),
             ("Órdenes", f"{stats['total_orders']}"),
-            ("Clientes", f"{unique_customers}")
+            ("Clientes", f"{unique_customers:,}")
         
         ]
         
         for title, value in metrics:
-            metric_frame = ttk.Frame(sidebar)
-            metric_frame.pack(fill=tk.X, padx=10, pady=3)
-            
-            ttk.Label(metric_frame, text=title, width=12).pack(side=tk.LEFT)
-            ttk.Label(metric_frame, text=value, style='Value.TLabel').pack(side=tk.RIGHT)
+            self.metric_vars[title].set(value)
     
     def clear_content(self):
         """Limpiar el área de contenido"""
@@ -162,38 +221,141 @@ class SalesAnalysisPro:
     def show_dashboard(self):
         """Mostrar dashboard principal"""
         self.clear_content()
+        self.current_view = self.show_dashboard
         self.visualizer.create_dashboard(self.content_frame)
         self.logger.info("Dashboard mostrado")
     
     def show_category_analysis(self):
         """Mostrar análisis por categoría"""
         self.clear_content()
+        self.current_view = self.show_category_analysis
         self.visualizer.create_category_chart(self.content_frame)
         self.logger.info("Análisis por categoría mostrado")
     
     def show_product_analysis(self):
         """Mostrar análisis de productos"""
         self.clear_content()
+        self.current_view = self.show_product_analysis
         self.visualizer.create_product_analysis(self.content_frame)
     
     def show_trend_analysis(self):
         """Mostrar análisis de tendencias"""
         self.clear_content()
+        self.current_view = self.show_trend_analysis
         self.visualizer.create_trend_analysis(self.content_frame)
     
     def refresh_data(self):
         """Refrescar datos y vistas"""
-        self.analyzer = SalesAnalyzer()
-        self.visualizer = SalesVisualizer(self.analyzer)
+        previous = self.analyzer
+        self.analyzer = self.create_analyzer()
+        previous.close()
+        self.visualizer = self.create_visualizer()
         self.update_sidebar_metrics(self.sidebar)
         self.show_dashboard()
         messagebox.showinfo("Éxito", "Datos actualizados correctamente")
         self.logger.info("Datos refrescados")
     
+    def refresh_visible_view(self):
+        """Actualizar solo la vista visible (en el dashboard, solo la pestaña activa)
+        
+        Lo que recorre filas o remuestrea se recalcula como mucho una vez cada
+        ``AUTO_REFRESH_VIEWS_MS``, no en cada cambio del archivo.
+        """
+        if self.current_view == self.show_dashboard:
+            self.visualizer.refresh_dashboard()
+        elif self.current_view is not None:
+            view = self.current_view
+            self.visualizer.defer(self.content_frame, lambda: self.update_visible_view(view))
+    
+    def update_visible_view(self, view):
+        """Actualizar la vista en su sitio (tablas conservan scroll y orden) o reconstruirla"""
+        if self.current_view != view:
+            # El usuario cambió de vista mientras tanto
+            return
+        if not self.visualizer.update_in_place(self.content_frame):
+            view()
+    
+    def toggle_live_mode(self):
+        """Activar/desactivar la actualización automática"""
+        if self.live_mode.get():
+            self.start_live_mode()
+        else:
+            self.stop_live_mode()
+    
+    def start_live_mode(self):
+        """Vigilar el origen de datos en segundo plano"""
+        if self.watcher is not None:
+            return
+        if self.analyzer.shared is not None:
+            # Los segmentos compartidos son una instantánea: no hay archivo que vigilar
+            self.live_mode.set(False)
+            self.logger.warning("Modo en vivo no disponible con un dataset compartido")
+            return
+        if self.analyzer.dataset is not None:
+            path = self.analyzer.dataset.manifest_path
+        else:
+            path = self.analyzer.data_path
+        
+        self.watcher = FileWatcher(path, self.live_events.put,
+                                   interval=self.config.AUTO_REFRESH_INTERVAL_MS / 1000,
+                                   debounce=self.config.AUTO_REFRESH_DEBOUNCE_MS / 1000)
+        self.watcher.start()
+        self.live_status.set("En vivo")
+        self.poll_live_events()
+        self.logger.info("Modo en vivo activado")
+    
+    def stop_live_mode(self):
+        if self.watcher is None:
+            return
+        self.watcher.stop()
+        self.watcher = None
+        self.live_status.set("")
+        self.logger.info("Modo en vivo desactivado")
+    
+    def poll_live_events(self):
+        """Atender en el hilo de Tk los cambios detectados por el vigilante"""
+        if self.watcher is None:
+            return
+        
+        changed_at = None
+        try:
+            while True:
+                changed_at = self.live_events.get_nowait()
+        except queue.Empty:
+            pass
+        
+        if changed_at is not None:
+            self.apply_live_update(changed_at)
+        self.root.after(self.config.AUTO_REFRESH_UI_POLL_MS, self.poll_live_events)
+    
+    def apply_live_update(self, changed_at):
+        """Cargar solo las filas nuevas y actualizar lo que se ve"""
+        try:
+            new_rows = self.analyzer.load_new_rows()
+        except Exception as e:
+            self.logger.error(f"Error en actualización en vivo: {e}")
+            return
+        if not new_rows:
+            return
+        
+        self.update_sidebar_metrics(self.sidebar)
+        self.refresh_visible_view()
+        self.root.update_idletasks()
+        
+        # Latencia desde el primer cambio sin notificar hasta que el dato está en pantalla
+        latency_ms = (time.time() - changed_at) * 1000
+        self.live_status.set(f"En vivo: +{new_rows} filas ({latency_ms:,.0f} ms)")
+        self.logger.info(f"Actualización en vivo: {new_rows} filas nuevas, latencia {latency_ms:.0f} ms")
+    
     def regenerate_data(self):
         """Regenerar datos de demostración"""
-        if messagebox.askyesno("Confirmar", "¿Regenerar todos los datos? Los datos existentes se perderán."):
-            generate_sales_data(self.config.DEFAULT_RECORDS)
+        if self.config.DATASET_DIR:
+            message = (f"¿Regenerar el dataset? Todas las particiones de "
+                       f"{self.config.DATASET_DIR} se reemplazarán por datos nuevos.")
+        else:
+            message = "¿Regenerar todos los datos? Los datos existentes se perderán."
+        if messagebox.askyesno("Confirmar", message):
+            self.generate_data(replace=True)
             self.refresh_data()
             self.logger.info("Datos regenerados")
     
@@ -218,4 +380,7 @@ Características:
 if __name__ == "__main__":
     root = tk.Tk()
     app = SalesAnalysisPro(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.bootstrap.shutdown()
+    if getattr(app, 'analyzer', None) is not None:
+        app.analyzer.close()
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Dataset de ventas particionado por fecha.
+
+Un directorio con un archivo CSV por partición (día o mes) y un
+``manifest.json`` con, por cada partición, su número de filas, el rango de
+fechas y los totales precalculados. Los totales globales salen del manifiesto
+sin leer filas y las consultas por fecha solo abren las particiones que
+solapan el rango pedido.
+"""
+
+import csv
+import json
+import os
+import uuid
+from collections import defaultdict
+from datetime import date, datetime
+from hyperloglog import HyperLogLog
+
+FIELDNAMES = ['order_id', 'customer_id', 'product', 'category', 'quantity', 'unit_price',
+              'sale_date', 'region', 'customer_type', 'total_sale']
+
+GRANULARITIES = {
+    'day': lambda sale_date: sale_date,
+    'month': lambda sale_date: sale_date[:7],
+}
+
+
+def customer_key(record):
+    """Identificador de cliente (los CSV antiguos sin customer_id usan región + tipo)"""
+    return record.get('customer_id') or f"{record['region']}_{record['customer_type']}"
+
+
+def normalize_date(value):
+    """Convertir date/datetime/str a 'YYYY-MM-DD' (None se conserva)"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Fecha no soportada: {value!r}")
+
+
+class PartitionedDataset:
+    MANIFEST_NAME = 'manifest.json'
+    MANIFEST_VERSION = 1
+
+    def __init__(self, root, granularity='month', create=False, hll_precision=12):
+        self.root = root
+        self.manifest_path = os.path.join(root, self.MANIFEST_NAME)
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        elif create:
+            if granularity not in GRANULARITIES:
+                raise ValueError(f"Granularidad no soportada: {granularity}")
+            os.makedirs(root, exist_ok=True)
+            self.manifest = {
+                'version': self.MANIFEST_VERSION,
+                'dataset_id': uuid.uuid4().hex,
+                'granularity': granularity,
+                'fieldnames': FIELDNAMES,
+                'hll_precision': hll_precision,
+                'partitions': []
+            }
+            self._write_manifest()
+        else:
+            raise FileNotFoundError(f"Manifiesto no encontrado: {self.manifest_path}")
+
+        self.granularity = self.manifest['granularity']
+        self.partition_key = GRANULARITIES[self.granularity]
+        self.hll_precision = self.manifest.get('hll_precision', hll_precision)
+        # Identifica el dataset: cambia si se regenera en el mismo directorio
+        self.dataset_id = self.manifest.get('dataset_id')
+
+    @property
+    def partitions(self):
+        return self.manifest['partitions']
+
+    def partition_path(self, entry):
+        return os.path.join(self.root, entry['file'])
+
+    def partitions_between(self, start_date=None, end_date=None):
+        """Particiones cuyo rango de fechas solapa [start_date, end_date]"""
+        start_date = normalize_date(start_date)
+        end_date = normalize_date(end_date)
+        return [
+            entry for entry in self.partitions
+            if (start_date is None or entry['max_date'] >= start_date)
+            and (end_date is None or entry['min_date'] <= end_date)
+        ]
+
+    def totals(self):
+        """Totales globales calculados solo a partir del manifiesto"""
+        partitions = self.partitions
+        return {
+            'total_sales': sum(entry['total_sales'] for entry in partitions),
+            'total_orders': sum(entry['rows'] for entry in partitions),
+            'total_quantity': sum(entry['total_quantity'] for entry in partitions),
+            'min_date': min((entry['min_date'] for entry in partitions), default=None),
+            'max_date': max((entry['max_date'] for entry in partitions), default=None),
+            'partitions': len(partitions)
+        }
+
+    def daily_aggregates(self, start_date=None, end_date=None):
+        """Ventas y órdenes por día combinando los manifiestos de partición"""
+        start_date = normalize_date(start_date)
+        end_date = normalize_date(end_date)
+        daily_sales = defaultdict(float)
+        daily_orders = defaultdict(int)
+
+        for entry in self.partitions_between(start_date, end_date):
+            for day, sales in entry['daily_sales'].items():
+                if (start_date is None or day >= start_date) and (end_date is None or day <= end_date):
+                    daily_sales[day] += sales
+                    daily_orders[day] += entry['daily_orders'][day]
+
+        return dict(daily_sales), dict(daily_orders)
+
+    def customer_sketch(self, start_date=None, end_date=None):
+        """Unión de los sketches de clientes de las particiones que solapan el rango
+
+        Devuelve también las particiones sin sketch (manifiestos antiguos),
+        que el llamador debe completar leyendo sus filas.
+        """
+        sketch = HyperLogLog(self.hll_precision)
+        missing = []
+        for entry in self.partitions_between(start_date, end_date):
+            if 'customers_hll' in entry:
+                sketch.merge(HyperLogLog.from_base64(entry['customers_hll']))
+            else:
+                missing.append(entry)
+        return sketch, missing
+
+    def segment_totals(self):
+        """Segmento región_tipo -> [ventas, órdenes] sumando los manifiestos de partición
+
+        Como ``customer_sketch``, devuelve también las particiones sin estos
+        totales (manifiestos antiguos).
+        """
+        totals = {}
+        missing = []
+        for entry in self.partitions:
+            if 'segment_sales' not in entry:
+                missing.append(entry)
+                continue
+            for segment, (sales, orders) in self.entry_segment_totals(entry).items():
+                segment_totals = totals.setdefault(segment, [0.0, 0])
+                segment_totals[0] += sales
+                segment_totals[1] += orders
+        return totals, missing
+
+    @staticmethod
+    def entry_segment_totals(entry):
+        return {
+            segment: [sales, entry['segment_orders'][segment]]
+            for segment, sales in entry['segment_sales'].items()
+        }
+
+    def append(self, records):
+        """Escribir registros nuevos como particiones nuevas (nunca reescribe archivos)"""
+        grouped = defaultdict(list)
+        for record in records:
+            grouped[self.partition_key(record['sale_date'])].append(record)
+
+        new_entries = []
+        for key in sorted(grouped):
+            path, file_name = self._new_partition_file(key)
+            rows = grouped[key]
+
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(rows)
+            os.replace(tmp_path, path)
+
+            entry = self._build_entry(file_name, key, rows)
+            self.partitions.append(entry)
+            new_entries.append(entry)
+
+        if new_entries:
+            self.manifest['fieldnames'] = FIELDNAMES
+            self._write_manifest()
+        return new_entries
+
+    def _new_partition_file(self, key):
+        """Nombre libre para una partición nueva de la clave dada"""
+        sequence = sum(1 for entry in self.partitions if entry['key'] == key) + 1
+        while True:
+            file_name = f"sales_{key}_{sequence:04d}.csv"
+            path = os.path.join(self.root, file_name)
+            if not os.path.exists(path):
+                return path, file_name
+            sequence += 1
+
+    def _build_entry(self, file_name, key, rows):
+        daily_sales = defaultdict(float)
+        daily_orders = defaultdict(int)
+        segment_sales = defaultdict(float)
+        segment_orders = defaultdict(int)
+        customers = HyperLogLog(self.hll_precision)
+        for row in rows:
+            daily_sales[row['sale_date']] += float(row['total_sale'])
+            daily_orders[row['sale_date']] += 1
+            segment = f"{row['region']}_{row['customer_type']}"
+            segment_sales[segment] += float(row['total_sale'])
+            segment_orders[segment] += 1
+            customers.add(customer_key(row))
+
+        return {
+            'file': file_name,
+            'key': key,
+            'rows': len(rows),
+            'min_date': min(daily_sales),
+            'max_date': max(daily_sales),
+            'total_sales': round(sum(daily_sales.values()), 2),
+            'total_quantity': sum(int(row['quantity']) for row in rows),
+            'daily_sales': {day: round(sales, 2) for day, sales in sorted(daily_sales.items())},
+            'daily_orders': dict(sorted(daily_orders.items())),
+            'segment_sales': {segment: round(sales, 2) for segment, sales in sorted(segment_sales.items())},
+            'segment_orders': dict(sorted(segment_orders.items())),
+            'customers_hll': customers.to_base64()
+        }
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,159 @@
+"""
+Intervalos de confianza bootstrap sobre agregados diarios.
+
+Se remuestrean días (no filas), así el coste depende del número de días y
+no del tamaño del dataset. Las réplicas se reparten en lotes de tamaño fijo
+entre un pool de procesos; cada lote usa su propia semilla derivada de la
+semilla base, de modo que el resultado es reproducible y no depende del
+número de procesos.
+
+Las estadísticas son funciones de módulo (se envían por pickle a los
+procesos) que reciben las muestras y un ``random.Random``.
+"""
+
+import math
+import os
+import random
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+BATCH_SIZE = 100
+
+
+def ratio_of_sums(days, rng=None):
+    """Venta promedio: suma de ventas / suma de órdenes de los días (remuestreados)"""
+    if rng is not None:
+        days = rng.choices(days, k=len(days))
+    orders = sum(day[1] for day in days)
+    return sum(day[0] for day in days) / orders if orders else 0.0
+
+
+def period_totals(periods, rng=None):
+    """Total por periodo; al remuestrear se eligen con reemplazo tantos días
+    como se observaron en cada periodo"""
+    if rng is None:
+        return [sum(days) for days in periods]
+    return [sum(rng.choices(days, k=len(days))) for days in periods]
+
+
+def mean_growth(weeks, rng=None):
+    """Crecimiento semanal medio (%) como en SalesAnalyzer.sales_trend_analysis"""
+    totals = period_totals(weeks, rng)
+    growth_rates = [
+        (current - previous) / previous * 100 if previous > 0 else 0
+        for previous, current in zip(totals, totals[1:])
+    ]
+    return statistics.mean(growth_rates) if growth_rates else 0.0
+
+
+def segment_ratios(segments, rng=None):
+    """Venta promedio de cada segmento (días remuestreados por segmento)"""
+    return tuple(ratio_of_sums(days, rng) for days in segments)
+
+
+def mean_of_totals(months, rng=None):
+    """Pronóstico: media de los totales de los últimos meses
+
+    Bootstrap jerárquico: se remuestrean los meses y luego los días de cada
+    mes, para que el intervalo refleje también la variación entre meses.
+    """
+    if rng is not None:
+        months = rng.choices(months, k=len(months))
+    totals = period_totals(months, rng)
+    return statistics.mean(totals) if totals else 0.0
+
+
+def run_batch(statistic, samples, seed, size):
+    """Un lote de réplicas con semilla propia (se ejecuta en un proceso del pool)"""
+    rng = random.Random(seed)
+    return [statistic(samples, rng) for _ in range(size)]
+
+
+def percentile(sorted_values, fraction):
+    """Percentil con interpolación lineal sobre valores ordenados"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+class BootstrapEngine:
+    def __init__(self, n_resamples=1000, confidence_level=0.95, seed=42, workers=None):
+        self.n_resamples = n_resamples
+        self.confidence_level = confidence_level
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def pool(self):
+        """Pool de procesos reutilizado entre llamadas"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            if sys.version_info >= (3, 9):
+                self._pool.shutdown(cancel_futures=True)
+            else:
+                # Python 3.8: sin cancel_futures, se esperan los lotes pendientes
+                self._pool.shutdown()
+            self._pool = None
+
+    def replicates(self, statistic, samples):
+        """Réplicas bootstrap de la estadística (en paralelo si hay varios procesos)"""
+        batches = [
+            (self.seed * 1_000_003 + index, min(BATCH_SIZE, self.n_resamples - start))
+            for index, start in enumerate(range(0, self.n_resamples, BATCH_SIZE))
+        ]
+        workers = min(self.workers, len(batches))
+
+        if workers <= 1:
+            results = [run_batch(statistic, samples, seed, size) for seed, size in batches]
+        else:
+            futures = [self.pool().submit(run_batch, statistic, samples, seed, size)
+                       for seed, size in batches]
+            results = [future.result() for future in futures]
+        return [value for batch in results for value in batch]
+
+    def interval(self, statistic, samples):
+        """Estimación puntual e intervalo percentil
+
+        Si la estadística devuelve una tupla se calcula un intervalo por
+        componente y se devuelve una lista de resultados.
+        """
+        estimate = statistic(samples)
+        replicates = self.replicates(statistic, samples)
+        if isinstance(estimate, tuple):
+            return [self._summarize(value, [replicate[i] for replicate in replicates])
+                    for i, value in enumerate(estimate)]
+        return self._summarize(estimate, replicates)
+
+    def _summarize(self, estimate, replicates):
+        alpha = (1 - self.confidence_level) / 2
+        ordered = sorted(replicates)
+        low = percentile(ordered, alpha) if ordered else estimate
+        high = percentile(ordered, 1 - alpha) if ordered else estimate
+        return {
+            'estimate': estimate,
+            'low': low,
+            'high': high,
+            'confidence_level': self.confidence_level,
+            'relative_width': (high - low) / abs(estimate) if estimate else math.inf
+        }
+
+
+def confidence_label(interval, threshold):
+    """'high' / 'medium' / 'low' según la precisión relativa del intervalo
+
+    La puntuación es ``1 - semiancho relativo``; 'high' si alcanza el umbral
+    y 'medium' si alcanza la mitad.
+    """
+    score = max(0.0, 1 - interval['relative_width'] / 2)
+    if score >= threshold:
+        return 'high', score
+    if score >= threshold / 2:
+        return 'medium', score
+    return 'low', score
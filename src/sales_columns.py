@@ -0,0 +1,188 @@
+"""
+Almacenamiento por columnas tipadas del dataset de ventas.
+
+Las columnas numéricas son ``array`` y las de texto repetitivo (producto,
+región, fecha, cliente...) se codifican como diccionario: un ``array`` de
+códigos más la lista de valores distintos. Los análisis agregan por código
+sin crear un dict por fila ni volver a parsear fechas.
+"""
+
+from array import array
+from collections import Counter
+from itertools import islice
+from partitioned_dataset import customer_key
+
+NUMERIC_FIELDS = {
+    'quantity': 'q',
+    'unit_price': 'd',
+    'total_sale': 'd',
+}
+CATEGORICAL_FIELDS = ['customer_id', 'product', 'category', 'sale_date', 'region', 'customer_type']
+TEXT_FIELDS = ['order_id']
+FIELD_ORDER = ['order_id', 'customer_id', 'product', 'category', 'quantity', 'unit_price',
+               'sale_date', 'region', 'customer_type', 'total_sale']
+
+
+def group_sums(codes, values, size):
+    """Suma de ``values`` agrupada por código (0..size-1)"""
+    sums = [0.0] * size
+    for code, value in zip(codes, values):
+        sums[code] += value
+    return sums
+
+
+def group_sums_many(codes, value_columns, size):
+    """Sumas de varias columnas agrupadas por código recorriendo las filas una vez"""
+    if len(value_columns) == 1:
+        return [group_sums(codes, value_columns[0], size)]
+    sums = [[0.0] * size for _ in value_columns]
+    if len(value_columns) == 3:
+        # Caso de los productos (ventas, unidades, precio) sin bucle interno por fila
+        first, second, third = sums
+        for code, a, b, c in zip(codes, *value_columns):
+            first[code] += a
+            second[code] += b
+            third[code] += c
+    else:
+        for code, *values in zip(codes, *value_columns):
+            for column_sums, value in zip(sums, values):
+                column_sums[code] += value
+    return sums
+
+
+class CategoricalColumn:
+    """Columna codificada como diccionario (los valores solo se añaden, nunca cambian)"""
+
+    def __init__(self, codes=None, values=None, index=None):
+        self.codes = codes if codes is not None else array('I')
+        self.values = values if values is not None else []
+        self._index = index
+
+    @property
+    def index(self):
+        """valor -> código (se construye al primer uso)"""
+        if self._index is None:
+            self._index = {value: code for code, value in enumerate(self.values)}
+        return self._index
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def register(self, raw_values):
+        """Códigos de los valores, añadiendo al diccionario los nuevos
+        (se mapea en C mientras no haya valores nuevos)"""
+        index = self.index
+        try:
+            return array('I', map(index.__getitem__, raw_values))
+        except KeyError:
+            # Valores nuevos: se registran en orden de aparición
+            setdefault = index.setdefault
+            codes = array('I', [setdefault(value, len(index)) for value in raw_values])
+            added = len(index) - len(self.values)
+            self.values.extend(reversed(list(islice(reversed(index), added))))
+            return codes
+
+    def encode(self, raw_values):
+        """Añadir filas a partir de sus valores"""
+        self.codes.extend(self.register(raw_values))
+
+    def extend(self, other):
+        """Añadir otra columna recodificando su diccionario"""
+        if other.values is self.values:
+            self.codes.extend(other.codes)
+            return
+        mapping = self.register(other.values)
+        self.codes.extend(map(mapping.__getitem__, other.codes))
+
+    def take(self, indices):
+        """Subconjunto de filas compartiendo el diccionario"""
+        codes = self.codes
+        # Un diccionario de solo lectura (memoria compartida) no crece: no hace
+        # falta compartir el índice ni construirlo por adelantado
+        index = self.index if isinstance(self.values, list) else self._index
+        return CategoricalColumn(array('I', (codes[i] for i in indices)), self.values, index)
+
+    def counts(self):
+        """Filas por código"""
+        return Counter(self.codes)
+
+
+class SalesColumns:
+    def __init__(self):
+        self.columns = {}
+        for name, typecode in NUMERIC_FIELDS.items():
+            self.columns[name] = array(typecode)
+        for name in CATEGORICAL_FIELDS:
+            self.columns[name] = CategoricalColumn()
+        for name in TEXT_FIELDS:
+            self.columns[name] = []
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__['columns'][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __len__(self):
+        return len(self.columns['total_sale'])
+
+    def extend(self, other):
+        """Concatenar otro conjunto de columnas"""
+        for name, column in self.columns.items():
+            column.extend(other.columns[name])
+        return self
+
+    def take(self, indices):
+        """Nuevas columnas con las filas indicadas"""
+        result = SalesColumns()
+        for name, column in self.columns.items():
+            if isinstance(column, CategoricalColumn):
+                result.columns[name] = column.take(indices)
+            elif isinstance(column, (array, memoryview)):
+                typecode = column.typecode if isinstance(column, array) else column.format
+                result.columns[name] = array(typecode, (column[i] for i in indices))
+            else:
+                result.columns[name] = [column[i] for i in indices]
+        return result
+
+    def select_dates(self, start_date=None, end_date=None):
+        """Filas con fecha en [start_date, end_date] (fechas 'YYYY-MM-DD')"""
+        if start_date is None and end_date is None:
+            return self
+        dates = self.sale_date
+        allowed = {
+            code for code, day in enumerate(dates.values)
+            if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+        }
+        if len(allowed) == len(dates.values):
+            return self
+        return self.take([i for i, code in enumerate(dates.codes) if code in allowed])
+
+    def records(self):
+        """Filas como dicts (solo para compatibilidad; evitar en datos grandes)"""
+        names = FIELD_ORDER
+        for values in zip(*(self.columns[name] for name in names)):
+            yield dict(zip(names, values))
+
+    @classmethod
+    def from_records(cls, records):
+        """Columnas a partir de dicts ya tipados"""
+        result = cls()
+        records = list(records)
+        for name, column in result.columns.items():
+            if name == 'customer_id':
+                values = [customer_key(record) for record in records]
+            else:
+                values = [record[name] for record in records]
+            if isinstance(column, CategoricalColumn):
+                column.encode(values)
+            else:
+                column.extend(values)
+        return result
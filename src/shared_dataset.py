@@ -0,0 +1,410 @@
+"""
+Dataset de ventas publicado en memoria compartida.
+
+Las columnas tipadas se copian una sola vez a segmentos de
+``multiprocessing.shared_memory``: los arrays numéricos y los códigos tal
+cual, y los textos (diccionarios de las columnas categóricas y order_id)
+como un bloque UTF-8 más un array de desplazamientos. Un segmento
+descriptor pequeño guarda un contador de referencias y un JSON con la
+ubicación de cada columna y los agregados ya calculados.
+
+Otros procesos se adjuntan por nombre sin copiar ni parsear: las columnas
+son ``memoryview`` sobre los segmentos y los textos se decodifican solo al
+consultarlos. El último proceso que suelta su referencia borra los segmentos.
+Las referencias se sueltan también al terminar el proceso; si un proceso
+muere sin poder hacerlo (p.ej. ``kill -9``), los segmentos quedan en
+``/dev/shm`` hasta eliminarlos con::
+
+    python shared_dataset.py --eliminar <nombre>
+"""
+
+import json
+import os
+import secrets
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from itertools import accumulate
+from multiprocessing import resource_tracker, shared_memory, util
+
+try:
+    import fcntl
+except ImportError:  # Windows: el segmento se libera al cerrarse el último handle
+    fcntl = None
+
+from sales_columns import CategoricalColumn, SalesColumns, group_sums_many
+
+SHARED_PREFIX = 'shm://'
+HEADER = struct.Struct('<qq')  # referencias, longitud del JSON
+OFFSET_TYPE = 'q'
+
+_tracker_lock = threading.Lock()
+_worker_dataset = None  # dataset adjuntado por este proceso del pool
+
+
+def open_segment(name, create=False, size=0):
+    """SharedMemory fuera del resource_tracker
+
+    El tracker borraría el segmento al terminar el proceso que lo abrió, y
+    los registros de varios procesos sobre el mismo nombre se pisan entre sí;
+    aquí la vida del segmento la decide el contador de referencias.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name=name, create=create, size=size)
+        finally:
+            resource_tracker.register = register
+
+
+def destroy(shm):
+    if sys.version_info < (3, 13) and os.name == 'posix':
+        # unlink() también lo quita del tracker: se registra para que cuadre
+        resource_tracker.register(shm._name, 'shared_memory')
+    shm.unlink()
+
+
+def create_segment(name, data):
+    """Segmento nuevo con el contenido de ``data`` (bytes, array o memoryview)"""
+    view = memoryview(data).cast('B')
+    shm = open_segment(name, create=True, size=max(1, view.nbytes))
+    shm.buf[:view.nbytes] = view
+    return shm
+
+
+def pack_strings(values):
+    """Textos -> (bloque UTF-8, desplazamientos de inicio/fin)"""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = array(OFFSET_TYPE, [0])
+    offsets.extend(accumulate(map(len, encoded)))
+    return b''.join(encoded), offsets
+
+
+def typecode_of(sequence):
+    return sequence.typecode if isinstance(sequence, array) else sequence.format
+
+
+def lock_path(name):
+    return os.path.join(tempfile.gettempdir(), f"{name}.lock")
+
+
+@contextmanager
+def descriptor_lock(name):
+    """Bloqueo entre procesos para leer y escribir el contador de referencias"""
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path(name), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def segment_names(layout):
+    return [spec[key] for spec in layout['columns'].values()
+            for key in ('data', 'codes', 'blob', 'offsets') if key in spec]
+
+
+def release_reference(name, descriptor, segments, views):
+    """Soltar una referencia; la última borra los segmentos y el lock"""
+    for view in views:
+        try:
+            view.release()
+        except BufferError:
+            pass
+    views.clear()
+
+    with descriptor_lock(name):
+        references, size = HEADER.unpack_from(descriptor.buf)
+        references -= 1
+        HEADER.pack_into(descriptor.buf, 0, references, size)
+        if references <= 0:
+            for shm in [*segments.values(), descriptor]:
+                destroy(shm)
+            if fcntl is not None:
+                os.remove(lock_path(name))
+
+    for shm in [*segments.values(), descriptor]:
+        try:
+            shm.close()
+        except BufferError:
+            # Quedan slices vivos de alguna columna: el mapeo se libera con ellos
+            pass
+
+
+def remove_shared_dataset(name):
+    """Borrar los segmentos de un dataset sin mirar el contador de referencias
+
+    Solo para restos de procesos que murieron sin soltar su referencia: los
+    procesos que sigan adjuntados conservan su mapeo, pero nadie más podrá
+    adjuntarse.
+    """
+    descriptor = open_segment(name)
+    size = HEADER.unpack_from(descriptor.buf)[1]
+    layout = json.loads(bytes(descriptor.buf[HEADER.size:HEADER.size + size]))
+    removed = 0
+    for segment_name in segment_names(layout):
+        try:
+            segment = open_segment(segment_name)
+        except FileNotFoundError:
+            continue
+        segment.close()
+        destroy(segment)
+        removed += 1
+    descriptor.close()
+    destroy(descriptor)
+    if fcntl is not None and os.path.exists(lock_path(name)):
+        os.remove(lock_path(name))
+    return removed + 1
+
+
+class StringPool:
+    """Secuencia de textos de solo lectura sobre un bloque UTF-8 compartido"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+    def __iter__(self):
+        blob = self.blob
+        offsets = self.offsets
+        return (str(blob[start:end], 'utf-8') for start, end in zip(offsets, offsets[1:]))
+
+
+class SharedSalesDataset:
+    """Referencia a un dataset en memoria compartida
+
+    Se obtiene con ``publish`` (crea los segmentos) o ``attach`` (se adjunta
+    por nombre); cada una cuenta como una referencia que ``release`` suelta.
+    """
+
+    def __init__(self, name, descriptor, segments, layout):
+        self.name = name
+        self.descriptor = descriptor
+        self.segments = segments
+        self.layout = layout
+        self.metadata = layout['metadata']
+        self._views = []
+        self._columns = None
+        # La referencia se suelta también si el objeto se pierde o el proceso
+        # termina (atexit en procesos normales, salida de procesos de multiprocessing)
+        self._finalizer = util.Finalize(self, release_reference,
+                                        args=(name, descriptor, segments, self._views),
+                                        exitpriority=10)
+
+    @classmethod
+    def publish(cls, columns, metadata=None, name=None):
+        """Copiar las columnas a segmentos nuevos (una sola vez)
+
+        ``metadata`` (serializable a JSON) viaja en el descriptor: agregados
+        diarios, sketch de clientes, origen de los datos...
+        """
+        name = name or f"sales_{secrets.token_hex(4)}"
+        segments = {}
+        layout = {'rows': len(columns), 'columns': {}, 'metadata': metadata or {}}
+
+        def add(data):
+            segment_name = f"{name}_{len(segments)}"
+            segments[segment_name] = create_segment(segment_name, data)
+            return segment_name
+
+        try:
+            for field, column in columns.columns.items():
+                if isinstance(column, CategoricalColumn):
+                    blob, offsets = pack_strings(column.values)
+                    spec = {'codes': add(column.codes), 'typecode': typecode_of(column.codes)}
+                elif isinstance(column, (array, memoryview)):
+                    layout['columns'][field] = {'data': add(column), 'typecode': typecode_of(column)}
+                    continue
+                else:
+                    blob, offsets = pack_strings(column)
+                    spec = {}
+                spec.update(blob=add(blob), blob_size=len(blob), offsets=add(offsets), count=len(offsets))
+                layout['columns'][field] = spec
+
+            payload = json.dumps(layout).encode('utf-8')
+            descriptor = open_segment(name, create=True, size=HEADER.size + len(payload))
+            HEADER.pack_into(descriptor.buf, 0, 1, len(payload))
+            descriptor.buf[HEADER.size:HEADER.size + len(payload)] = payload
+        except Exception:
+            for shm in segments.values():
+                shm.close()
+                destroy(shm)
+            raise
+        return cls(name, descriptor, segments, layout)
+
+    @classmethod
+    def attach(cls, name):
+        """Adjuntarse a un dataset publicado (sin copiar sus columnas)"""
+        descriptor = open_segment(name)
+        with descriptor_lock(name):
+            references, size = HEADER.unpack_from(descriptor.buf)
+            if references > 0:
+                HEADER.pack_into(descriptor.buf, 0, references + 1, size)
+        if references <= 0:
+            descriptor.close()
+            raise FileNotFoundError(f"Dataset compartido ya liberado: {name}")
+
+        layout = json.loads(bytes(descriptor.buf[HEADER.size:HEADER.size + size]))
+        shared = cls(name, descriptor, {}, layout)
+        try:
+            for segment_name in segment_names(layout):
+                shared.segments[segment_name] = open_segment(segment_name)
+        except Exception:
+            shared.release()
+            raise
+        return shared
+
+    @property
+    def rows(self):
+        return self.layout['rows']
+
+    @property
+    def released(self):
+        return not self._finalizer.still_active()
+
+    @property
+    def columns(self):
+        """Columnas como vistas sobre los segmentos (solo lectura)"""
+        if self.released:
+            raise ValueError(f"Dataset compartido liberado: {self.name}")
+        if self._columns is None:
+            columns = SalesColumns()
+            for field, spec in self.layout['columns'].items():
+                if 'data' in spec:
+                    columns.columns[field] = self.view(spec['data'], spec['typecode'], self.rows)
+                elif 'codes' in spec:
+                    codes = self.view(spec['codes'], spec['typecode'], self.rows)
+                    columns.columns[field] = CategoricalColumn(codes, self.strings(spec))
+                else:
+                    columns.columns[field] = self.strings(spec)
+            # Las vistas mantienen viva la referencia mientras se usen
+            columns.source = self
+            self._columns = columns
+        return self._columns
+
+    def view(self, segment_name, typecode, length):
+        nbytes = length * array(typecode).itemsize
+        view = self.segments[segment_name].buf[:nbytes].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def strings(self, spec):
+        return StringPool(self.view(spec['blob'], 'B', spec['blob_size']),
+                          self.view(spec['offsets'], OFFSET_TYPE, spec['count']))
+
+    def daily_aggregates(self):
+        """Ventas y órdenes por día publicadas junto a las columnas"""
+        return dict(self.metadata.get('daily_sales', {})), dict(self.metadata.get('daily_orders', {}))
+
+    def release(self):
+        """Soltar esta referencia; la última borra los segmentos"""
+        self._columns = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def range_group_sums(columns, field, value_fields, start, stop):
+    """Sumas de cada columna de ``value_fields`` y filas por código en las filas [start, stop)"""
+    codes = columns.columns[field].codes[start:stop]
+    values = [columns.columns[value_field][start:stop] for value_field in value_fields]
+    sums = group_sums_many(codes, values, len(columns.columns[field].values))
+    counts = Counter(codes)
+    codes.release()
+    for view in values:
+        view.release()
+    return sums, counts
+
+
+def worker_dataset(name):
+    """Dataset adjuntado una sola vez por proceso del pool
+
+    Se conserva entre tareas y se suelta al pedir otro dataset o al terminar
+    el proceso.
+    """
+    global _worker_dataset
+    if _worker_dataset is None or _worker_dataset.name != name or _worker_dataset.released:
+        if _worker_dataset is not None:
+            _worker_dataset.release()
+        _worker_dataset = SharedSalesDataset.attach(name)
+    return _worker_dataset
+
+
+def partial_group_sums(name, field, value_fields, start, stop):
+    """Se ejecuta en un proceso del pool: agrega su rango directamente sobre los segmentos"""
+    return range_group_sums(worker_dataset(name).columns, field, value_fields, start, stop)
+
+
+def parallel_group_totals(shared, field, value_fields, executor=None, chunks=1):
+    """Sumas de cada columna de ``value_fields`` y filas por código de ``field``
+
+    Todas las columnas se agregan en la misma pasada. Con un ``executor`` de
+    procesos las filas se reparten en ``chunks`` rangos; cada proceso agrega
+    directamente sobre los segmentos.
+    """
+    rows = shared.rows
+    if executor is None or chunks <= 1 or rows < chunks:
+        partials = [range_group_sums(shared.columns, field, value_fields, 0, rows)]
+    else:
+        bounds = [rows * i // chunks for i in range(chunks + 1)]
+        futures = [executor.submit(partial_group_sums, shared.name, field, value_fields, start, stop)
+                   for start, stop in zip(bounds, bounds[1:])]
+        partials = [future.result() for future in futures]
+
+    size = len(shared.columns.columns[field].values)
+    sums = [[0.0] * size for _ in value_fields]
+    counts = Counter()
+    for partial_sums, partial_counts in partials:
+        counts.update(partial_counts)
+        for total_sums, column_sums in zip(sums, partial_sums):
+            for code in partial_counts:
+                total_sums[code] += column_sums[code]
+    return sums, counts
+
+
+def parallel_group_sums(shared, field, value_field='total_sale', executor=None, chunks=1):
+    """Suma de ``value_field`` y filas por código de ``field`` en todo el dataset"""
+    sums, counts = parallel_group_totals(shared, field, (value_field,), executor, chunks)
+    return sums[0], counts
+
+
+if __name__ == "__main__":
+    # Publicar un CSV o directorio para que otras instancias se adjunten con
+    # AppConfig.SHARED_DATASET = <nombre>, o eliminar los restos de uno
+    if len(sys.argv) > 2 and sys.argv[1] == '--eliminar':
+        for dataset_name in sys.argv[2:]:
+            print(f"{dataset_name}: {remove_shared_dataset(dataset_name)} segmentos eliminados")
+        sys.exit()
+
+    from analysis_engine import SalesAnalyzer
+
+    analyzer = SalesAnalyzer(sys.argv[1] if len(sys.argv) > 1 else 'data/sample_sales.csv')
+    name = analyzer.publish_shared(sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Dataset publicado como '{name}' ({analyzer.shared.rows:,} filas). Enter para liberar.")
+    try:
+        input()
+    except (KeyboardInterrupt, EOFError):
+        pass
+    analyzer.close()
@@ -0,0 +1,275 @@
+"""
+Tabla virtualizada sobre ttk.Treeview.
+
+Los datos se guardan por columnas (listas o ``array``) y el Treeview solo
+contiene tantas filas como caben en pantalla: al desplazarse se reutilizan
+los mismos items cambiando sus valores. Las filas visibles más un pequeño
+margen se formatean bajo demanda y el orden por cada columna se calcula una
+sola vez, de modo que ordenar desde la cabecera no reordena ni reinserta nada.
+
+``VirtualView`` contiene esa lógica (orden, ventana visible, margen y
+scroll) sin widgets; ``VirtualTable`` la conecta con el Treeview.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from array import array
+
+
+class VirtualView:
+    """Estado de una tabla virtualizada independiente de Tk"""
+
+    def __init__(self, keys, formatters, buffer_rows=20):
+        self.keys = keys
+        self.formatters = formatters
+        self.buffer_rows = buffer_rows
+
+        self.data = {}
+        self.total_rows = 0
+        self.sort_orders = {}
+        self.sort_key = None
+        self.descending = False
+        self.offset = 0
+        self.visible_rows = 1
+        self.selected_row = None
+        self._row_cache = {}
+
+    def set_data(self, data, keep_view=False):
+        """Cargar datos por columnas: {clave: secuencia} con la misma longitud
+
+        Con ``keep_view`` se conservan el orden elegido y la posición de scroll
+        (p. ej. al actualizar en vivo); la selección se pierde porque los
+        índices de fila cambian.
+        """
+        self.data = {key: data[key] for key in self.keys}
+        self.total_rows = len(self.data[self.keys[0]]) if self.keys else 0
+
+        # Órdenes precalculados por columna (índices de fila compactos)
+        index_type = 'I' if self.total_rows < 2 ** 32 else 'Q'
+        self.sort_orders = {
+            key: array(index_type, sorted(range(self.total_rows), key=values.__getitem__))
+            for key, values in self.data.items()
+        }
+
+        if keep_view:
+            self.offset = self.clamp_offset(self.offset)
+        else:
+            self.sort_key = None
+            self.descending = False
+            self.offset = 0
+        self.selected_row = None
+        self._row_cache.clear()
+
+    def row_at(self, position):
+        """Índice de fila mostrado en la posición dada según el orden actual"""
+        if self.sort_key is None:
+            return position
+        order = self.sort_orders[self.sort_key]
+        return order[self.total_rows - 1 - position] if self.descending else order[position]
+
+    def row_values(self, position):
+        """Valores formateados de una posición (cacheados mientras estén cerca de la vista)"""
+        values = self._row_cache.get(position)
+        if values is None:
+            row = self.row_at(position)
+            values = tuple(fmt(self.data[key][row]) for key, fmt in zip(self.keys, self.formatters))
+            self._row_cache[position] = values
+        return values
+
+    def visible_count(self):
+        return max(0, min(self.visible_rows, self.total_rows - self.offset))
+
+    def prefetch_range(self):
+        """Posiciones de la vista más el margen a cada lado"""
+        start = max(0, self.offset - self.buffer_rows)
+        end = min(self.total_rows, self.offset + self.visible_rows + self.buffer_rows)
+        return range(start, end)
+
+    def prefetch(self):
+        """Formatear el margen alrededor de la vista y olvidar el resto"""
+        window = self.prefetch_range()
+        for position in list(self._row_cache):
+            if position not in window:
+                del self._row_cache[position]
+        for position in window:
+            self.row_values(position)
+
+    def clamp_offset(self, offset):
+        """Primera posición válida: la última página queda llena si hay filas suficientes"""
+        return max(0, min(offset, self.total_rows - self.visible_rows))
+
+    def scroll_to(self, offset):
+        """Desplazar la vista; devuelve si cambió"""
+        offset = self.clamp_offset(offset)
+        if offset == self.offset:
+            return False
+        self.offset = offset
+        return True
+
+    def resize(self, visible_rows):
+        """Cambiar cuántas filas caben; devuelve si cambió"""
+        visible_rows = max(1, visible_rows)
+        if visible_rows == self.visible_rows:
+            return False
+        self.visible_rows = visible_rows
+        self.offset = self.clamp_offset(self.offset)
+        return True
+
+    def sort_by(self, key):
+        """Ordenar por columna usando el orden precalculado (repetir invierte)"""
+        if self.sort_key == key:
+            self.descending = not self.descending
+        else:
+            self.sort_key = key
+            self.descending = False
+        self.offset = 0
+        self._row_cache.clear()
+
+    def move_selection(self, delta):
+        """Mover la selección ``delta`` posiciones desplazando la vista si hace falta
+
+        Si la fila seleccionada no está a la vista se parte de la primera
+        visible. Devuelve si hay filas que seleccionar.
+        """
+        if not self.total_rows:
+            return False
+        visible = range(self.offset, self.offset + self.visible_count())
+        positions = [position for position in visible if self.row_at(position) == self.selected_row]
+        position = positions[0] + delta if positions else self.offset
+        position = max(0, min(position, self.total_rows - 1))
+
+        if position < self.offset:
+            self.offset = position
+        elif position >= self.offset + self.visible_rows:
+            self.offset = position - self.visible_rows + 1
+        self.selected_row = self.row_at(position)
+        return True
+
+
+class VirtualTable(ttk.Frame):
+    def __init__(self, parent, columns, data=None, buffer_rows=20, **kwargs):
+        """
+        columns: lista de (clave, título, ancho, formateador) donde el
+        formateador convierte el valor crudo en el texto mostrado.
+        """
+        super().__init__(parent, **kwargs)
+        self.columns = columns
+        self.keys = [column[0] for column in columns]
+        self.view = VirtualView(self.keys, [column[3] or str for column in columns], buffer_rows)
+        self._item_rows = {}
+
+        self.tree = ttk.Treeview(self, columns=self.keys, show='headings',
+                                 selectmode='browse', height=1)
+        for key, heading, width, _ in columns:
+            self.tree.heading(key, text=heading, command=lambda k=key: self.sort_by(k))
+            self.tree.column(key, width=width)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll_rows(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll_rows(3))
+        self.tree.bind('<Up>', lambda e: self.move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self.move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self.scroll_rows(-self.view.visible_rows))
+        self.tree.bind('<Next>', lambda e: self.scroll_rows(self.view.visible_rows))
+        self.tree.bind('<<TreeviewSelect>>', self.on_select)
+
+        if data is not None:
+            self.set_data(data)
+
+    def set_data(self, data, keep_view=False):
+        """Cargar datos por columnas (ver ``VirtualView.set_data``)"""
+        self.view.set_data(data, keep_view=keep_view)
+        self.update_headings()
+        self.render()
+
+    def render(self):
+        """Materializar solo las filas visibles y preparar el margen"""
+        view = self.view
+        count = view.visible_count()
+        items = list(self.tree.get_children())
+
+        # Reutilizar items existentes; solo se crean o borran por cambio de tamaño
+        while len(items) < count:
+            items.append(self.tree.insert('', 'end'))
+        if len(items) > count:
+            self.tree.delete(*items[count:])
+            del items[count:]
+
+        self._item_rows = {}
+        selected_item = None
+        for i, item in enumerate(items):
+            position = view.offset + i
+            self.tree.item(item, values=view.row_values(position))
+            row = view.row_at(position)
+            self._item_rows[item] = row
+            if row == view.selected_row:
+                selected_item = item
+
+        if selected_item is not None:
+            self.tree.selection_set(selected_item)
+        elif self.tree.selection():
+            self.tree.selection_remove(*self.tree.selection())
+
+        view.prefetch()
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        view = self.view
+        if view.total_rows:
+            first = view.offset / view.total_rows
+            last = min(1.0, (view.offset + view.visible_rows) / view.total_rows)
+        else:
+            first, last = 0.0, 1.0
+        self.scrollbar.set(first, last)
+
+    def scroll_to(self, offset):
+        if self.view.scroll_to(offset):
+            self.render()
+
+    def scroll_rows(self, delta):
+        self.scroll_to(self.view.offset + delta)
+        return 'break'
+
+    def move_selection(self, delta):
+        """Mover la selección con el teclado desplazando la vista si hace falta"""
+        if self.view.move_selection(delta):
+            self.render()
+        return 'break'
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self.scroll_to(int(float(value) * self.view.total_rows))
+        elif action == 'scroll':
+            step = self.view.visible_rows if unit == 'pages' else 1
+            self.scroll_rows(int(value) * step)
+
+    def on_mousewheel(self, event):
+        return self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        """Recalcular cuántas filas caben en la vista"""
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # La cabecera ocupa aproximadamente una fila
+        if self.view.resize(event.height // row_height - 1):
+            self.render()
+
+    def on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self.view.selected_row = self._item_rows.get(selection[0], self.view.selected_row)
+
+    def sort_by(self, key):
+        self.view.sort_by(key)
+        self.update_headings()
+        self.render()
+
+    def update_headings(self):
+        for key, heading, _, _ in self.columns:
+            if key == self.view.sort_key:
+                heading = f"{heading} {'▼' if self.view.descending else '▲'}"
+            self.tree.heading(key, text=heading)
@@ -1,10 +1,16 @@
 import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
+from virtual_table import VirtualTable
 
 class SalesVisualizer:
-    def __init__(self, analyzer):
+    def __init__(self, analyzer, live_refresh_ms=5000):
         self.analyzer = analyzer
+        self.live_refresh_ms = live_refresh_ms
+        self._deferred_refresh = None
+        self._deferred_callback = None
+        # Contenedor -> (widget, función) de las vistas que se actualizan sin reconstruirse
+        self.live_updaters = {}
         self.setup_styles()
     
     def setup_styles(self):
@@ -31,63 +37,153 @@ class SalesVisualizer:
         metrics_frame.pack(fill=tk.X, pady=(0, 20))
         
         self.create_metrics_grid(metrics_frame)
+        self.metrics_frame = metrics_frame
         
-        # Gráficos
+        # Gráficos (cada pestaña se construye cuando se muestra)
         notebook = ttk.Notebook(frame)
         notebook.pack(fill=tk.BOTH, expand=True)
+        self.dashboard_notebook = notebook
+        self.dashboard_tabs = {}
         
-        # Pestaña de tendencias
-        trend_frame = ttk.Frame(notebook)
-        notebook.add(trend_frame, text="📈 Tendencias")
-        self.create_trend_analysis(trend_frame)
+        for text, builder in [("📈 Tendencias", self.create_trend_analysis),
+                              ("🏆 Productos", self.create_product_analysis),
+                              ("👥 Clientes", self.create_customer_analysis)]:
+            tab = ttk.Frame(notebook)
+            notebook.add(tab, text=text)
+            self.dashboard_tabs[str(tab)] = (tab, builder)
         
-        # Pestaña de productos
-        product_frame = ttk.Frame(notebook)
-        notebook.add(product_frame, text="🏆 Productos")
-        self.create_product_analysis(product_frame)
-        
-        # Pestaña de clientes
-        customer_frame = ttk.Frame(notebook)
-        notebook.add(customer_frame, text="👥 Clientes")
-        self.create_customer_analysis(customer_frame)
+        self.stale_tabs = set(self.dashboard_tabs)
+        notebook.bind('<<NotebookTabChanged>>', self.show_dashboard_tab)
+        self.show_dashboard_tab()
         
         return frame
     
+    def show_dashboard_tab(self, event=None):
+        """Construir la pestaña visible si no existe o sus datos cambiaron"""
+        current = self.dashboard_notebook.select()
+        if current in self.stale_tabs:
+            tab, builder = self.dashboard_tabs[current]
+            if not self.update_in_place(tab):
+                for widget in tab.winfo_children():
+                    widget.destroy()
+                builder(tab)
+            self.stale_tabs.discard(current)
+    
+    def update_in_place(self, parent):
+        """Actualizar la vista construida en ``parent`` sin recrear sus widgets
+        
+        Devuelve False si esa vista no lo admite (o ya no existe) y hay que
+        reconstruirla.
+        """
+        widget, update = self.live_updaters.get(str(parent), (None, None))
+        if widget is None or not widget.winfo_exists():
+            self.live_updaters.pop(str(parent), None)
+            return False
+        update()
+        return True
+    
+    def refresh_dashboard(self):
+        """Actualizar tras cargar filas nuevas
+        
+        Las tarjetas salen de agregados incrementales y cambian al momento; los
+        intervalos bootstrap y la pestaña visible (que recorren filas o
+        remuestrean) se recalculan como mucho una vez cada ``live_refresh_ms``.
+        """
+        self.update_metrics()
+        self.stale_tabs = set(self.dashboard_tabs)
+        self.defer(self.metrics_frame, self.refresh_dashboard_details)
+    
+    def refresh_dashboard_details(self):
+        if self.metrics_frame.winfo_exists():
+            self.update_metric_intervals()
+            self.show_dashboard_tab()
+    
+    def defer(self, widget, callback):
+        """Ejecutar ``callback`` pasados ``live_refresh_ms``
+        
+        Las llamadas que llegan mientras tanto no reprograman el temporizador:
+        solo se ejecuta la última, una vez.
+        """
+        self._deferred_callback = callback
+        if self._deferred_refresh is None:
+            root = widget.winfo_toplevel()
+            self._deferred_refresh = root.after(self.live_refresh_ms, self.apply_deferred_refresh)
+    
+    def apply_deferred_refresh(self):
+        callback = self._deferred_callback
+        self._deferred_refresh = None
+        self._deferred_callback = None
+        if callback is not None:
+            callback()
+    
     def create_metrics_grid(self, parent):
-        """Grid de métricas clave"""
+        """Grid de métricas clave (al actualizar solo cambian los textos)"""
+        values = self.metric_texts()
+        details = self.interval_texts()
+        self.metric_labels = {}
+        
+        for titles in (["Ventas Totales", "Crecimiento Semanal", "Valor Promedio Orden"],
+                       ["Total Órdenes", "Venta Promedio", "Semanas Analizadas", "Segmentos Cliente"]):
+            row = ttk.Frame(parent)
+            row.pack(fill=tk.X, pady=5)
+            for column, title in enumerate(titles):
+                self.metric_labels[title] = self.create_metric_card(row, title, values[title], column,
+                                                                    detail=details.get(title))
+    
+    def metric_texts(self):
+        """Textos de las tarjetas a partir de agregados incrementales (sin recorrer filas)"""
         stats = self.analyzer.get_summary_stats()
         trend_analysis = self.analyzer.sales_trend_analysis()
-        customer_analysis = self.analyzer.customer_analysis()
-        
-        # Fila 1
-        row1 = ttk.Frame(parent)
-        row1.pack(fill=tk.X, pady=5)
-        
-        self.create_metric_card(row1, "Ventas Totales", 
-                               f"${stats['total_sales']:,.2f}", 0)
-        self.create_metric_card(row1, "Crecimiento Semanal", 
-                               f"{trend_analysis['average_weekly_growth']}%", 1)
-        self.create_metric_card(row1, "Valor Promedio Orden", 
-                               f"${customer_analysis['average_order_value']:,.2f}", 2)
-        
-        # Fila 2
-        row2 = ttk.Frame(parent)
-        row2.pack(fill=tk.X, pady=5)
-        
-        self.create_metric_card(row2, "Total Órdenes", 
-                               f"{stats['total_orders']:,}", 0)
-        self.create_metric_card(row2, "Semanas Analizadas", 
-                               f"{trend_analysis['total_weeks']}", 1)
-        self.create_metric_card(row2, "Segmentos Cliente", 
-                               f"{customer_analysis['customer_segments']}", 2)
+        segments = self.analyzer.segment_totals()
+        average_order_value = sum(sales for sales, _ in segments.values()) / len(segments) if segments else 0
+        
+        return {
+            "Ventas Totales": f"${stats['total_sales']:,.2f}",
+            "Crecimiento Semanal": f"{trend_analysis['average_weekly_growth']}%",
+            "Valor Promedio Orden": f"${average_order_value:,.2f}",
+            "Total Órdenes": f"{stats['total_orders']:,}",
+            "Venta Promedio": f"${stats['average_sale']:,.2f}",
+            "Semanas Analizadas": f"{trend_analysis['total_weeks']}",
+            "Segmentos Cliente": f"{len(segments)}"
+        }
+    
+    def interval_texts(self):
+        """Intervalos bootstrap de las tarjetas que los muestran"""
+        intervals = self.analyzer.bootstrap_intervals()
+        return {
+            "Crecimiento Semanal": self.format_interval(intervals['weekly_growth'], "{:.1f}%"),
+            "Venta Promedio": self.format_interval(intervals['average_sale'], "${:,.0f}")
+        }
     
-    def create_metric_card(self, parent, title, value, column):
-        """Tarjeta de métrica individual"""
+    def update_metrics(self):
+        for title, text in self.metric_texts().items():
+            self.metric_labels[title][0].configure(text=text)
+    
+    def update_metric_intervals(self):
+        for title, text in self.interval_texts().items():
+            self.metric_labels[title][1].configure(text=text)
+    
+    def create_metric_card(self, parent, title, value, column, detail=None):
+        """Tarjeta de métrica individual; devuelve las etiquetas de valor y detalle"""
         card = ttk.Frame(parent, relief='solid', borderwidth=1)
         card.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
         
         ttk.Label(card, text=title, style='Metric.TLabel').pack(pady=(8, 2))
-        ttk.Label(card, text=value, style='Value.TLabel').pack(pady=(2, 8))
+        value_label = ttk.Label(card, text=value, style='Value.TLabel')
+        value_label.pack(pady=(2, 2 if detail else 8))
+        detail_label = None
+        if detail:
+            detail_label = ttk.Label(card, text=detail)
+            detail_label.pack(pady=(0, 8))
+        return value_label, detail_label
+    
+    @staticmethod
+    def format_interval(interval, value_format):
+        """Texto 'IC 95%: [bajo, alto]' de un intervalo bootstrap"""
+        level = round(interval['confidence_level'] * 100)
+        low = value_format.format(interval['low'])
+        high = value_format.format(interval['high'])
+        return f"IC {level}%: [{low}, {high}]"
     
     def create_trend_analysis(self, parent):
         """Análisis de tendencias temporal"""
@@ -138,7 +234,12 @@ class SalesVisualizer:
         ttk.Label(insight_frame, text="Predicción próximo mes:").pack(anchor=tk.W)
         ttk.Label(insight_frame, text=f"${predictive['predicted_next_month']:,.2f}",
                  style='Metric.TLabel').pack(anchor=tk.W)
-        ttk.Label(insight_frame, text=f"Confianza: {predictive['confidence']}",
+        if predictive['prediction_interval']:
+            low, high = predictive['prediction_interval']
+            ttk.Label(insight_frame, text=f"Intervalo bootstrap: ${low:,.2f} - ${high:,.2f}",
+                     style='Value.TLabel').pack(anchor=tk.W)
+        ttk.Label(insight_frame, text=f"Confianza: {predictive['confidence']} "
+                                      f"({predictive['confidence_score']:.2f})",
                  style='Value.TLabel').pack(anchor=tk.W)
 
     def create_product_analysis(self, parent):
@@ -152,52 +253,44 @@ class SalesVisualizer:
                                font=('Arial', 16, 'bold'))
         title_label.pack(pady=10)
         
-        # Métricas de productos
-        product_metrics = self.analyzer.product_performance_metrics()
+        # Ranking compacto de productos (columnas ordenadas por ingresos)
+        ranking = self.analyzer.product_ranking()
         
         # Frame para métricas principales
         metrics_frame = ttk.Frame(main_frame)
         metrics_frame.pack(fill=tk.X, padx=20, pady=10)
         
         # Producto más vendido
-        best_product = product_metrics.get('best_selling_product', 'N/A')
-        ttk.Label(metrics_frame, text=f"🏆 Producto más vendido: {best_product}", 
-                 font=('Arial', 12)).pack(pady=5)
+        best_label = ttk.Label(metrics_frame, text=self.best_product_text(ranking),
+                               font=('Arial', 12))
+        best_label.pack(pady=5)
         
         # Ranking de productos por revenue
         ranking_frame = ttk.LabelFrame(main_frame, text="Ranking de Productos por Ingresos")
         ranking_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
-        # Treeview para mostrar el ranking
-        tree = ttk.Treeview(ranking_frame, columns=('Producto', 'Ingresos', 'Unidades', 'Precio Promedio'), show='headings')
-        
-        # Configurar columnas
-        tree.heading('Producto', text='Producto')
-        tree.heading('Ingresos', text='Ingresos Total')
-        tree.heading('Unidades', text='Unidades Vendidas')
-        tree.heading('Precio Promedio', text='Precio Promedio')
-        
-        tree.column('Producto', width=150)
-        tree.column('Ingresos', width=120)
-        tree.column('Unidades', width=120)
-        tree.column('Precio Promedio', width=120)
-        
-        # Agregar datos
-        for product in product_metrics.get('rank_by_revenue', []):
-            metrics = product_metrics['product_metrics'][product]
-            tree.insert('', 'end', values=(
-                product,
-                f"${metrics['total_revenue']:,.2f}",
-                metrics['units_sold'],
-                f"${metrics['average_price']:,.2f}"
-            ))
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(ranking_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Tabla virtualizada: solo se materializan las filas visibles
+        columns = [
+            ('product', 'Producto', 150, None),
+            ('total_revenue', 'Ingresos Total', 120, lambda value: f"${value:,.2f}"),
+            ('units_sold', 'Unidades Vendidas', 120, None),
+            ('average_price', 'Precio Promedio', 120, lambda value: f"${value:,.2f}")
+        ]
+        table = VirtualTable(ranking_frame, columns, data=ranking)
+        table.pack(fill=tk.BOTH, expand=True)
+        
+        # En vivo se cambian los datos de la tabla conservando scroll y orden
+        self.live_updaters[str(parent)] = (table, lambda: self.update_product_analysis(best_label, table))
+    
+    def update_product_analysis(self, best_label, table):
+        ranking = self.analyzer.product_ranking()
+        best_label.configure(text=self.best_product_text(ranking))
+        table.set_data(ranking, keep_view=True)
+    
+    @staticmethod
+    def best_product_text(ranking):
+        best_product = ranking['product'][0] if ranking['product'] else 'N/A'
+        return f"🏆 Producto más vendido: {best_product}"
 
     def create_customer_analysis(self, parent):
         """Análisis de comportamiento del cliente"""
@@ -218,8 +311,13 @@ class SalesVisualizer:
         metrics = [
             ("Valor promedio por orden", f"${customer_data['average_order_value']:,.2f}"),
             ("Segmentos de cliente", f"{customer_data['customer_segments']}"),
-            ("Cliente que más gasta", f"{customer_data['top_spending_segment'] or 'N/A'}"),
-            ("Cliente más frecuente", f"{customer_data['most_frequent_segment'] or 'N/A'}")
+            ("Clientes únicos", f"{customer_data['total_customers']:,}"),
+            ("Gasto medio por cliente", f"${customer_data['average_customer_spend']:,.2f}"),
+            ("Compras por cliente", f"{customer_data['average_purchase_frequency']}"),
+            ("Cliente que más gasta", f"{customer_data['top_customer'] or 'N/A'}"),
+            ("Cliente más frecuente", f"{customer_data['most_frequent_customer'] or 'N/A'}"),
+            ("Segmento que más gasta", f"{customer_data['top_spending_segment'] or 'N/A'}"),
+            ("Segmento más frecuente", f"{customer_data['most_frequent_segment'] or 'N/A'}")
         ]
         
         for title, value in metrics:
@@ -227,6 +325,19 @@ class SalesVisualizer:
             metric_frame.pack(fill=tk.X, pady=3)
             ttk.Label(metric_frame, text=title, width=20).pack(side=tk.LEFT)
             ttk.Label(metric_frame, text=value, style='Value.TLabel').pack(side=tk.RIGHT)
+        
+        # Venta promedio por segmento con intervalo bootstrap
+        segments = self.analyzer.segment_intervals()
+        segments_frame = ttk.LabelFrame(main_frame, text="Venta Promedio por Segmento")
+        segments_frame.pack(fill=tk.X, padx=20, pady=10)
+        
+        for segment, interval in segments.items():
+            segment_frame = ttk.Frame(segments_frame)
+            segment_frame.pack(fill=tk.X, padx=5, pady=2)
+            ttk.Label(segment_frame, text=segment, width=20).pack(side=tk.LEFT)
+            ttk.Label(segment_frame, text=f"${interval['estimate']:,.2f}",
+                      style='Value.TLabel').pack(side=tk.LEFT, padx=10)
+            ttk.Label(segment_frame, text=self.format_interval(interval, "${:,.0f}")).pack(side=tk.RIGHT)
 
     def create_category_chart(self, parent):
         """Gráfico de ventas por categoría"""
@@ -0,0 +1,59 @@
+import csv
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from partitioned_dataset import FIELDNAMES  # noqa: E402
+
+PRODUCTS = ['Laptop', 'Mouse', 'Teclado', 'Monitor', 'Impresora']
+REGIONS = ['Norte', 'Sur', 'Este', 'Oeste']
+CUSTOMER_TYPES = ['Minorista', 'Mayorista', 'Gobierno']
+
+
+def build_records(count, seed=0, first_order=0, start=date(2024, 1, 1), days=90):
+    """Registros tipados deterministas"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        quantity = rng.randint(1, 5)
+        unit_price = round(rng.uniform(10, 1000), 2)
+        records.append({
+            'order_id': f"ORD_{first_order + i}",
+            'customer_id': f"CUST_{rng.randint(1, count // 3 + 1):06d}",
+            'product': rng.choice(PRODUCTS),
+            'category': 'Electrónica',
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'sale_date': (start + timedelta(days=rng.randrange(days))).isoformat(),
+            'region': rng.choice(REGIONS),
+            'customer_type': rng.choice(CUSTOMER_TYPES),
+            'total_sale': round(quantity * unit_price, 2),
+        })
+    return records
+
+
+def write_csv(path, records, mode='w'):
+    with open(path, mode, newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        if mode == 'w':
+            writer.writeheader()
+        writer.writerows(records)
+
+
+def sums_by(records, field, value_field='total_sale'):
+    sums = {}
+    for record in records:
+        sums[record[field]] = sums.get(record[field], 0) + record[value_field]
+    return sums
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Cada test en un directorio propio (SalesAnalyzer escribe su log en el directorio actual)"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
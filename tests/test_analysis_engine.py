@@ -0,0 +1,92 @@
+from collections import Counter
+
+import pytest
+
+from analysis_engine import SalesAnalyzer
+from data_generator import generate_sales_data
+from hyperloglog import HyperLogLog
+from resampling import BootstrapEngine
+
+from conftest import build_records, sums_by, write_csv
+
+
+def test_segment_totals_are_updated_incrementally(workdir):
+    records = build_records(300, seed=6)
+    path = str(workdir / 'sales.csv')
+    write_csv(path, records[:200])
+    analyzer = SalesAnalyzer(path, bootstrap=BootstrapEngine(workers=1))
+    analyzer.segment_totals()
+
+    write_csv(path, records[200:], mode='a')
+    analyzer.load_new_rows()
+
+    expected = SalesAnalyzer.aggregate_segments(analyzer.columns)
+    assert analyzer.segment_totals().keys() == expected.keys()
+    for segment, (sales, orders) in expected.items():
+        assert analyzer.segment_totals()[segment] == [pytest.approx(sales), orders]
+
+
+def test_customer_sketches_match_per_key_sketches(workdir):
+    records = build_records(300, seed=8)
+    path = str(workdir / 'sales.csv')
+    write_csv(path, records)
+    analyzer = SalesAnalyzer(path, bootstrap=BootstrapEngine(workers=1))
+
+    expected = {}
+    for record in records:
+        expected.setdefault(record['region'], HyperLogLog(12)).add(record['customer_id'])
+
+    sketches = analyzer.customer_sketches('region')
+    assert list(sketches) == sorted(expected)
+    assert all(sketches[key].registers == expected[key].registers for key in expected)
+
+
+def test_live_reload_detects_replaced_dataset(workdir):
+    root = str(workdir / 'sales')
+    generate_sales_data(500, dataset_dir=root)
+    analyzer = SalesAnalyzer(root, bootstrap=BootstrapEngine(workers=1))
+    assert analyzer.get_summary_stats()['total_orders'] == 500
+    analyzer.segment_totals()
+
+    generate_sales_data(100, dataset_dir=root, replace=True)
+    assert analyzer.load_new_rows() == 100
+    assert analyzer.get_summary_stats()['total_orders'] == 100
+    assert sum(orders for _, orders in analyzer.segment_totals().values()) == 100
+    assert len(analyzer.columns) == 100
+
+    generate_sales_data(50, dataset_dir=root)
+    assert analyzer.load_new_rows() == 50
+    assert analyzer.get_summary_stats()['total_orders'] == 150
+
+
+def test_dataset_segment_totals_come_from_the_manifest(workdir):
+    root = str(workdir / 'sales')
+    generate_sales_data(300, dataset_dir=root)
+    analyzer = SalesAnalyzer(root, bootstrap=BootstrapEngine(workers=1))
+    totals = analyzer.segment_totals()
+    assert analyzer._columns is None
+
+    generate_sales_data(100, dataset_dir=root)
+    analyzer.load_new_rows()
+    assert analyzer._columns is None
+
+    expected = SalesAnalyzer.aggregate_segments(analyzer.columns)
+    assert totals.keys() == expected.keys()
+    for segment, (sales, orders) in expected.items():
+        assert totals[segment] == [pytest.approx(sales), orders]
+
+
+def test_product_aggregates_sum_every_column(workdir):
+    records = build_records(300, seed=9)
+    path = str(workdir / 'sales.csv')
+    write_csv(path, records)
+    aggregates = SalesAnalyzer(path, bootstrap=BootstrapEngine(workers=1)).product_aggregates()
+
+    revenue = sums_by(records, 'product')
+    units = sums_by(records, 'product', 'quantity')
+    prices = sums_by(records, 'product', 'unit_price')
+    orders = Counter(record['product'] for record in records)
+    assert aggregates == {
+        product: [pytest.approx(revenue[product]), units[product], pytest.approx(prices[product]), orders[product]]
+        for product in revenue
+    }
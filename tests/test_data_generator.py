@@ -0,0 +1,34 @@
+import os
+
+from data_generator import generate_sales_data
+from partitioned_dataset import PartitionedDataset
+
+
+def test_dataset_generation_appends_or_replaces(workdir):
+    root = str(workdir / 'sales')
+    generate_sales_data(200, dataset_dir=root)
+    generate_sales_data(200, dataset_dir=root)
+    assert PartitionedDataset(root).totals()['total_orders'] == 400
+
+    generate_sales_data(150, dataset_dir=root, replace=True)
+    dataset = PartitionedDataset(root)
+    assert dataset.totals()['total_orders'] == 150
+    assert sum(1 for name in os.listdir(root) if name.endswith('.csv')) == len(dataset.partitions)
+    assert sorted(os.listdir(workdir)) == ['sales']
+
+
+def test_csv_generation_writes_requested_path(workdir):
+    path = str(workdir / 'custom' / 'ventas.csv')
+    generate_sales_data(120, csv_path=path)
+    with open(path, encoding='utf-8') as f:
+        assert sum(1 for _ in f) == 121
+    assert sorted(os.listdir(workdir)) == ['custom']
+
+
+def test_dataset_generation_uses_requested_sketch_precision(workdir):
+    root = str(workdir / 'sales')
+    generate_sales_data(100, dataset_dir=root, hll_precision=10)
+    dataset = PartitionedDataset(root)
+    assert dataset.hll_precision == 10
+    sketch, missing = dataset.customer_sketch()
+    assert sketch.precision == 10 and not missing
@@ -0,0 +1,111 @@
+import csv
+import os
+
+from analysis_engine import SalesAnalyzer
+from fast_ingest import read_sales_csv
+from partitioned_dataset import PartitionedDataset
+from resampling import BootstrapEngine
+
+from conftest import build_records, write_csv
+
+
+def quarantined_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def append_bad_row(path, order_id):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f"{order_id},CUST_1,Mouse,Accesorios,no-es-numero,10.0,2024-01-05,Norte,Minorista,10.0\n")
+
+
+def test_bad_rows_are_quarantined_with_line_numbers(workdir):
+    path = str(workdir / 'sales.csv')
+    write_csv(path, build_records(10))
+    append_bad_row(path, 'ORD_BAD')
+
+    result = read_sales_csv(path, quarantine_path='quarantine.csv')
+
+    assert len(result.columns) == 10
+    assert result.quarantined == 1
+    assert [row['line_number'] for row in quarantined_rows('quarantine.csv')] == ['12']
+
+
+def test_full_reload_does_not_duplicate_quarantine(workdir):
+    path = str(workdir / 'sales.csv')
+    write_csv(path, build_records(10))
+    append_bad_row(path, 'ORD_BAD')
+
+    first = read_sales_csv(path, quarantine_path='quarantine.csv')
+    read_sales_csv(path, quarantine_path='quarantine.csv')
+    assert len(quarantined_rows('quarantine.csv')) == 1
+
+    # Una lectura incremental solo añade las filas nuevas
+    append_bad_row(path, 'ORD_BAD_2')
+    read_sales_csv(path, offset=first.offset, fieldnames=first.fieldnames,
+                   quarantine_path='quarantine.csv', first_line=first.line_number + 1)
+    assert [row['line_number'] for row in quarantined_rows('quarantine.csv')] == ['12', '13']
+
+
+def test_partitions_are_quarantined_once(workdir):
+    root = workdir / 'sales'
+    dataset = PartitionedDataset(str(root), create=True)
+    dataset.append(build_records(50))
+    append_bad_row(dataset.partition_path(dataset.partitions[0]), 'ORD_BAD')
+
+    for _ in range(2):
+        analyzer = SalesAnalyzer(str(root), bootstrap=BootstrapEngine(workers=1))
+        analyzer.columns_between('2024-01-01', '2024-01-31')
+        analyzer.columns_between('2024-01-01', '2024-01-15')
+        assert analyzer.quarantined == 1
+        assert len(quarantined_rows(analyzer.quarantine_path)) == 1
+
+
+def write_quoted_csv(path, records):
+    """CSV con un producto entre comillas que contiene un salto de línea"""
+    records[3]['product'] = 'Mouse\ngrande'
+    records[5]['product'] = 'Teclado, "compacto"'
+    write_csv(path, records)
+    append_bad_row(path, 'ORD_BAD')
+
+
+def test_quoted_newlines_are_kept_in_one_field(workdir):
+    path = str(workdir / 'sales.csv')
+    records = build_records(10)
+    write_quoted_csv(path, records)
+
+    result = read_sales_csv(path, quarantine_path='quarantine.csv')
+
+    assert len(result.columns) == 10
+    assert list(result.columns.product) == [record['product'] for record in records]
+    # El registro de dos líneas desplaza la fila inválida a la línea 13
+    assert [row['line_number'] for row in quarantined_rows('quarantine.csv')] == ['13']
+    assert result.line_number == 13
+
+
+def test_blocks_are_not_cut_inside_quotes(workdir):
+    path = str(workdir / 'sales.csv')
+    records = build_records(10)
+    write_quoted_csv(path, records)
+    expected = read_sales_csv(path)
+
+    for block_size in (7, 50, 333):
+        result = read_sales_csv(path, quarantine_path='quarantine.csv', block_size=block_size)
+        assert list(result.columns.product) == list(expected.columns.product)
+        assert list(result.columns.total_sale) == list(expected.columns.total_sale)
+        assert [row['line_number'] for row in quarantined_rows('quarantine.csv')] == ['13']
+
+
+def test_unterminated_quote_is_quarantined_at_end_of_file(workdir):
+    path = str(workdir / 'sales.csv')
+    write_csv(path, build_records(5))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('ORD_X,CUST_1,"Mouse,Accesorios,1,10.0,2024-01-05,Norte,Minorista,10.0\n')
+
+    assert read_sales_csv(path, complete_lines_only=True).offset < os.path.getsize(path)
+
+    result = read_sales_csv(path, quarantine_path='quarantine.csv')
+    assert len(result.columns) == 5
+    assert result.line_number == 7
+    assert [(row['line_number'], row['error']) for row in quarantined_rows('quarantine.csv')] == \
+        [('7', 'comillas sin cerrar')]
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from file_watcher import FileWatcher
+
+
+def test_continuous_appends_still_notify(workdir):
+    path = workdir / 'sales.csv'
+    path.write_text('header\n')
+    events = []
+    watcher = FileWatcher(str(path), events.append, interval=0.05, debounce=0.15)
+    watcher.start()
+    try:
+        time.sleep(0.1)
+        started = time.time()
+        # Escrituras más seguidas que el debounce durante más de max_wait
+        while time.time() - started < 1.0:
+            with open(path, 'a') as f:
+                f.write('row\n')
+            time.sleep(0.05)
+        written_until = time.time()
+    finally:
+        watcher.stop()
+
+    notified = [changed_at for changed_at in events if changed_at <= written_until]
+    assert len(notified) >= 2
+    # La latencia se mide desde el primer cambio sin notificar
+    assert notified[0] - started < 0.2
+
+
+def test_burst_is_notified_once(workdir):
+    path = workdir / 'sales.csv'
+    path.write_text('header\n')
+    notified = threading.Event()
+    events = []
+
+    def on_change(changed_at):
+        events.append(changed_at)
+        notified.set()
+
+    watcher = FileWatcher(str(path), on_change, interval=0.05, debounce=0.2, max_wait=5)
+    watcher.start()
+    try:
+        time.sleep(0.1)
+        for _ in range(3):
+            with open(path, 'a') as f:
+                f.write('row\n')
+            time.sleep(0.02)
+        assert notified.wait(2)
+        time.sleep(0.3)
+    finally:
+        watcher.stop()
+    assert len(events) == 1
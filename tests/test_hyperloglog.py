@@ -0,0 +1,30 @@
+import pytest
+
+from hyperloglog import HyperLogLog
+
+
+def test_union_keeps_precision_of_inputs():
+    first = HyperLogLog(14)
+    first.update(f"CUST_{i}" for i in range(1000))
+    second = HyperLogLog(14)
+    second.update(f"CUST_{i}" for i in range(500, 1500))
+
+    union = HyperLogLog.union([first, second])
+
+    assert union.precision == 14
+    assert len(union) == pytest.approx(1500, rel=0.05)
+    assert HyperLogLog.union([]).precision == 12
+
+
+def test_union_rejects_mixed_precisions():
+    with pytest.raises(ValueError):
+        HyperLogLog.union([HyperLogLog(12), HyperLogLog(14)])
+
+
+def test_round_trip_and_idempotent_adds():
+    sketch = HyperLogLog(10)
+    sketch.update(["a", "b", "a", "c"])
+    restored = HyperLogLog.from_base64(sketch.to_base64())
+
+    assert restored.registers == sketch.registers
+    assert len(restored) == 3
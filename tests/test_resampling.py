@@ -0,0 +1,33 @@
+from analysis_engine import SalesAnalyzer
+from resampling import BootstrapEngine, ratio_of_sums
+
+from conftest import build_records, write_csv
+
+DAYS = [(100.0 + i * 7 % 13, 1 + i % 3) for i in range(40)]
+
+
+def test_interval_does_not_depend_on_worker_count():
+    single = BootstrapEngine(n_resamples=300, workers=1)
+    pooled = BootstrapEngine(n_resamples=300, workers=2)
+    try:
+        assert single.interval(ratio_of_sums, DAYS) == pooled.interval(ratio_of_sums, DAYS)
+    finally:
+        pooled.shutdown()
+
+
+def test_close_shuts_down_only_an_owned_pool(workdir):
+    path = str(workdir / 'sales.csv')
+    write_csv(path, build_records(100, seed=9))
+
+    owned = SalesAnalyzer(path)
+    owned.bootstrap.workers = 2
+    owned.bootstrap_intervals()
+    owned.close()
+    assert owned.bootstrap._pool is None
+
+    shared_engine = BootstrapEngine(n_resamples=200, workers=2)
+    analyzer = SalesAnalyzer(path, bootstrap=shared_engine)
+    analyzer.bootstrap_intervals()
+    analyzer.close()
+    assert shared_engine._pool is not None
+    shared_engine.shutdown()
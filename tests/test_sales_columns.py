@@ -0,0 +1,66 @@
+import pytest
+
+from analysis_engine import SalesAnalyzer
+from fast_ingest import read_sales_csv
+from partitioned_dataset import PartitionedDataset
+from resampling import BootstrapEngine
+from sales_columns import SalesColumns
+
+from conftest import build_records, sums_by, write_csv
+
+
+def column_lengths(columns):
+    return {name: len(column) for name, column in columns.columns.items()}
+
+
+def test_extend_keeps_columns_aligned():
+    first = SalesColumns.from_records(build_records(1, seed=1))
+    second = SalesColumns.from_records(build_records(1, seed=2, first_order=1))
+    first.extend(second)
+
+    assert set(column_lengths(first).values()) == {2}
+    assert [record['order_id'] for record in first.records()] == ['ORD_0', 'ORD_1']
+
+
+def test_incremental_read_matches_single_load(workdir):
+    records = build_records(500, seed=3)
+    path = str(workdir / 'sales.csv')
+    write_csv(path, records[:300])
+    partial = read_sales_csv(path)
+    write_csv(path, records[300:], mode='a')
+    tail = read_sales_csv(path, offset=partial.offset, fieldnames=partial.fieldnames,
+                          first_line=partial.line_number + 1)
+
+    columns = partial.columns.extend(tail.columns)
+    single = read_sales_csv(path).columns
+
+    assert set(column_lengths(columns).values()) == {500}
+    assert list(columns.records()) == list(single.records())
+
+
+def test_load_new_rows_matches_fresh_load(workdir):
+    records = build_records(400, seed=4)
+    path = str(workdir / 'sales.csv')
+    write_csv(path, records[:395])
+    analyzer = SalesAnalyzer(path, bootstrap=BootstrapEngine(workers=1))
+    write_csv(path, records[395:], mode='a')
+
+    assert analyzer.load_new_rows() == 5
+    assert set(column_lengths(analyzer.columns).values()) == {400}
+
+    fresh = SalesAnalyzer(path, bootstrap=BootstrapEngine(workers=1))
+    assert analyzer.product_aggregates() == fresh.product_aggregates()
+    assert analyzer.customer_analysis() == fresh.customer_analysis()
+
+
+def test_partitioned_columns_match_raw_records(workdir):
+    records = build_records(700, seed=5)
+    dataset = PartitionedDataset(str(workdir / 'sales'), create=True)
+    dataset.append(records[:350])
+    dataset.append(records[350:])
+
+    analyzer = SalesAnalyzer(str(workdir / 'sales'), bootstrap=BootstrapEngine(workers=1))
+    columns = analyzer.columns_between()
+
+    assert set(column_lengths(columns).values()) == {700}
+    assert analyzer.product_sales() == pytest.approx(sums_by(records, 'product'))
@@ -0,0 +1,59 @@
+import gc
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from sales_columns import SalesColumns
+from shared_dataset import SharedSalesDataset, parallel_group_sums, parallel_group_totals
+
+from conftest import build_records, sums_by
+
+
+@pytest.fixture
+def columns():
+    return SalesColumns.from_records(build_records(400, seed=7))
+
+
+def test_attach_shares_columns_and_last_release_removes_segments(columns):
+    published = SharedSalesDataset.publish(columns, {'source': 'test'})
+    attached = SharedSalesDataset.attach(published.name)
+
+    assert list(attached.columns.records()) == list(columns.records())
+    assert attached.metadata == {'source': 'test'}
+
+    published.release()
+    assert len(attached.columns) == 400
+    attached.release()
+    with pytest.raises(FileNotFoundError):
+        SharedSalesDataset.attach(published.name)
+
+
+def test_lost_reference_is_released(columns):
+    name = SharedSalesDataset.publish(columns).name
+    gc.collect()
+    with pytest.raises(FileNotFoundError):
+        SharedSalesDataset.attach(name)
+
+
+def test_parallel_group_sums_match_single_process(columns):
+    records = list(columns.records())
+    with SharedSalesDataset.publish(columns) as shared:
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            for _ in range(3):
+                sums, counts = parallel_group_sums(shared, 'product', executor=executor, chunks=2)
+        products = shared.columns.product.values
+        assert {products[code]: sums[code] for code in counts} == pytest.approx(sums_by(records, 'product'))
+        assert sum(counts.values()) == len(records)
+
+
+def test_parallel_group_totals_aggregate_several_columns_at_once(columns):
+    records = list(columns.records())
+    value_fields = ('total_sale', 'quantity', 'unit_price')
+    with SharedSalesDataset.publish(columns) as shared:
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            sums, counts = parallel_group_totals(shared, 'product', value_fields,
+                                                 executor=executor, chunks=2)
+        products = shared.columns.product.values
+        for field, field_sums in zip(value_fields, sums):
+            assert {products[code]: field_sums[code] for code in counts} == \
+                pytest.approx(sums_by(records, 'product', field))
@@ -0,0 +1,78 @@
+from virtual_table import VirtualView
+
+
+def build_view(values, visible_rows=3, buffer_rows=2):
+    view = VirtualView(['name', 'value'], [str, lambda value: f"{value:.1f}"], buffer_rows=buffer_rows)
+    view.set_data({'name': [f"p{i}" for i in range(len(values))], 'value': values})
+    view.resize(visible_rows)
+    return view
+
+
+def test_row_at_follows_sort_direction():
+    view = build_view([30, 10, 20, 40])
+    assert [view.row_at(position) for position in range(4)] == [0, 1, 2, 3]
+
+    view.sort_by('value')
+    assert [view.row_at(position) for position in range(4)] == [1, 2, 0, 3]
+    assert view.row_values(0) == ('p1', '10.0')
+
+    view.sort_by('value')
+    assert view.descending
+    assert [view.row_at(position) for position in range(4)] == [3, 0, 2, 1]
+
+
+def test_prefetch_keeps_only_the_window_around_the_view():
+    view = build_view(list(range(20)), visible_rows=3, buffer_rows=2)
+    view.scroll_to(10)
+    view.row_values(0)
+    view.prefetch()
+    assert view.prefetch_range() == range(8, 15)
+    assert sorted(view._row_cache) == list(range(8, 15))
+
+    view.scroll_to(0)
+    view.prefetch()
+    assert sorted(view._row_cache) == list(range(0, 5))
+
+
+def test_scroll_and_resize_clamp_the_offset():
+    view = build_view(list(range(10)), visible_rows=4)
+    assert view.scroll_to(100)
+    assert view.offset == 6
+    assert not view.scroll_to(7)
+    assert view.scroll_to(-5)
+    assert view.offset == 0
+
+    view.scroll_to(6)
+    assert view.resize(8)
+    assert view.offset == 2
+    assert view.resize(20)
+    assert view.offset == 0
+    assert not view.resize(20)
+    assert view.resize(0) and view.visible_rows == 1
+
+
+def test_set_data_can_keep_sort_and_scroll():
+    view = build_view(list(range(10)), visible_rows=4)
+    view.sort_by('value')
+    view.sort_by('value')
+    view.scroll_to(5)
+
+    view.set_data({'name': [f"q{i}" for i in range(8)], 'value': list(range(8))}, keep_view=True)
+    assert (view.sort_key, view.descending, view.offset) == ('value', True, 4)
+
+    view.set_data({'name': ['a'], 'value': [1]})
+    assert (view.sort_key, view.descending, view.offset) == (None, False, 0)
+
+
+def test_move_selection_scrolls_the_view():
+    view = build_view(list(range(10)), visible_rows=3)
+    assert view.move_selection(1)
+    assert view.selected_row == 0
+
+    for _ in range(3):
+        view.move_selection(1)
+    assert (view.selected_row, view.offset) == (3, 1)
+
+    view.scroll_to(7)
+    view.move_selection(-1)
+    assert (view.selected_row, view.offset) == (7, 7)